@@ -70,6 +70,8 @@ async def add_sample_tool():
     else:
         print("\n✗ Verification failed - tool not found")
 
+    await db.close()
+
 
 if __name__ == "__main__":
     asyncio.run(add_sample_tool())
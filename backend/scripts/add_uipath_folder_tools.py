@@ -61,6 +61,8 @@ async def main():
     for tool_def in TOOLS:
         print(f"  - {tool_def['name']}: {tool_def['description']}")
 
+    await db.close()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
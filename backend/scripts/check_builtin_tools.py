@@ -40,6 +40,8 @@ async def main():
         status = "✅" if tool["is_active"] else "❌"
         print(f"{status} {tool['name']}")
 
+    await db.close()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
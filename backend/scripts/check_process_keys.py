@@ -38,6 +38,8 @@ async def main():
             print(f"    Folder Path:  {tool.get('uipath_folder_path', 'N/A')}")
             print()
 
+    await db.close()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
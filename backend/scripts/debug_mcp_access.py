@@ -127,5 +127,7 @@ async def debug_access():
         print(f"     -H 'Content-Type: application/json' \\")
         print(f"     -d '{{\"username\":\"{owner['username']}\",\"password\":\"YOUR_PASSWORD\"}}'")
 
+    await db.close()
+
 if __name__ == "__main__":
     asyncio.run(debug_access())
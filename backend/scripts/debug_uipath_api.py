@@ -129,6 +129,8 @@ async def debug_api_call():
         print("  3. Verify folder path exists and is accessible")
         print("  4. Test PAT in UiPath Cloud UI first")
 
+    await db.close()
+
 
 if __name__ == "__main__":
     asyncio.run(debug_api_call())
@@ -16,7 +16,7 @@ async def main():
     
     # Discover all tools
     print("Discovering tools...")
-    tools = await discover_builtin_tools()
+    tools = discover_builtin_tools()
     
     # Filter storage bucket tools
     storage_tools = [t for t in tools if "storage" in t["name"].lower()]
@@ -62,6 +62,8 @@ async def main():
     await db.set_builtin_tools_version(6)
     print(f"\n✅ Done! Version set to 6")
 
+    await db.close()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -58,6 +58,8 @@ async def migrate():
         else:
             print("\n✅ All tools have valid tool_type")
 
+    await db.close()
+
 
 if __name__ == "__main__":
     asyncio.run(migrate())
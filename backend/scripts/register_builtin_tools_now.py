@@ -27,7 +27,7 @@ async def main():
     
     # Discover tools first
     print("\nDiscovering tools...")
-    tools = await discover_builtin_tools()
+    tools = discover_builtin_tools()
     print(f"Found {len(tools)} tools")
     
     # Register
@@ -39,6 +39,8 @@ async def main():
     new_version = await db.get_builtin_tools_version()
     print(f"New DB version: {new_version}")
 
+    await db.close()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -86,6 +86,8 @@ async def main():
     print("  1. uipath_get_jobs_stats - Get job statistics by status")
     print("  2. uipath_get_queues_table - Get queue statistics table")
 
+    await db.close()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
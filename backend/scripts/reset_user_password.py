@@ -3,17 +3,13 @@
 import asyncio
 import sys
 import os
-import hashlib
 import argparse
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 import aiosqlite
 
-
-def hash_password(password: str) -> str:
-    """Hash a password using SHA-256."""
-    return hashlib.sha256(password.encode()).hexdigest()
+from src.database import hash_password
 
 
 async def reset_password(username: str, new_password: str, db_path: str):
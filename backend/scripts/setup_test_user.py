@@ -95,6 +95,8 @@ async def setup_user():
     print("  2. Test UiPath process listing:")
     print("     python backend/tests/test_uipath_processes.py")
 
+    await db.close()
+
 
 if __name__ == "__main__":
     asyncio.run(setup_user())
@@ -22,7 +22,7 @@ async def main():
     # Test 1: Discover tools
     print("Test 1: Discovering built-in tools...")
     print("-" * 60)
-    tools = await discover_builtin_tools()
+    tools = discover_builtin_tools()
     print(f"\nDiscovered {len(tools)} tools:")
     for tool in tools:
         print(f"  - {tool['name']}")
@@ -77,6 +77,8 @@ async def main():
     print("✅ All tests completed!")
     print("=" * 60)
 
+    await db.close()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -38,6 +38,8 @@ async def test_token():
     else:
         print(f"❌ No token found!")
 
+    await db.close()
+
 
 if __name__ == "__main__":
     asyncio.run(test_token())
@@ -51,6 +51,8 @@ async def update_tool_path():
     else:
         print("✗ Failed to update")
 
+    await db.close()
+
 
 if __name__ == "__main__":
     asyncio.run(update_tool_path())
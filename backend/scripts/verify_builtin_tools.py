@@ -24,7 +24,7 @@ async def verify_builtin_tools():
     
     # 1. 도구 발견
     print("📋 1단계: 도구 발견 중...")
-    tools = await discover_builtin_tools()
+    tools = discover_builtin_tools()
     
     if not tools:
         print("❌ 오류: 도구를 발견하지 못했습니다!")
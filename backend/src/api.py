@@ -42,6 +42,12 @@ async def startup_event():
     await db.initialize()
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled database connections on shutdown."""
+    await db.close()
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
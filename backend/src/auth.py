@@ -160,16 +160,10 @@ async def check_mcp_access(
     
     if token:
         # Check if it's a server API token
-        server_token = await db.get_server_token(tenant_name, server_name)
-        if server_token:
-            logger.info(f"Server has API token: {server_token[:20]}...")
-            if token == server_token:
-                logger.info("✅ Valid server API token")
-                return True
-            else:
-                logger.warning("❌ Token mismatch with server API token")
-        else:
-            logger.info("Server has no API token configured")
+        if await db.verify_server_token(tenant_name, server_name, token):
+            logger.info("✅ Valid server API token")
+            return True
+        logger.info("Token does not match a server API token")
     
     # Method 2: Check JWT token (user authentication)
     user = await get_current_user(request, db)
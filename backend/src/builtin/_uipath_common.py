@@ -0,0 +1,530 @@
+"""Shared HTTP helpers for the UiPath built-in tools.
+
+Modules starting with an underscore are skipped by the built-in tools
+registry, so nothing here is exposed as an MCP tool.
+"""
+
+import asyncio
+import logging
+import random
+import time
+import weakref
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+import httpx
+from urllib.parse import urlparse
+
+try:
+    import orjson
+
+    # Parse straight from response bytes, no intermediate str decode
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:  # pragma: no cover - orjson is a declared dependency
+    import json
+
+    json_loads = json.loads  # also accepts bytes
+
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+logger = logging.getLogger(__name__)
+
+# Headers sent with every Orchestrator API call. Baked into the pooled
+# clients so call sites only pass the per-call authorization/folder headers.
+DEFAULT_HEADERS = {
+    "accept": "application/json",
+    "content-type": "application/json",
+    "x-uipath-orchestrator": "true",
+}
+
+# Status codes worth retrying: timeouts, throttling and gateway errors.
+# Auth failures (401/403) and other 4xx responses are never retried.
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 502, 503, 504})
+
+# Connection pool size of each pooled client, and the most requests in
+# flight against one Orchestrator. Keeping the per-Orchestrator cap equal
+# to the keep-alive pool means every admitted request can reuse a
+# connection, and one busy Orchestrator cannot take the whole pool.
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_ORCHESTRATOR = 20
+
+# Circuit breaker states
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+# Pooled clients per event loop, keyed by (verify_ssl, orchestrator). httpx
+# connections are bound to the loop that opened them, and scripts call
+# asyncio.run() more than once, so a single global client is not safe.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[bool, bool], httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+# Bulkhead semaphores per event loop, keyed by Orchestrator base URL
+_bulkheads: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Short-lived cache of parsed responses: key -> (stored_at, value)
+_RESPONSE_CACHE_MAX_ENTRIES = 256
+_response_cache: Dict[Hashable, Tuple[float, Any]] = {}
+
+# Requests currently in flight, keyed like the response cache
+_inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+
+class UiPathAPIError(Exception):
+    """Raised when a UiPath Orchestrator API call fails.
+
+    When built from an error response, the status code and body are only
+    formatted when the error is turned into a string (e.g., when logged).
+    """
+
+    def __init__(self, message: str, response: Optional[httpx.Response] = None):
+        super().__init__(message)
+        self.response = response
+
+    @property
+    def status_code(self) -> Optional[int]:
+        """HTTP status code of the failed response, if any."""
+        return None if self.response is None else self.response.status_code
+
+    def __str__(self) -> str:
+        message = super().__str__()
+        if self.response is None:
+            return message
+        return f"{message}: {self.response.status_code} - {self.response.text}"
+
+
+class CircuitOpenError(UiPathAPIError):
+    """Raised when calls to an Orchestrator are short-circuited."""
+
+
+class DeadlineExceededError(UiPathAPIError, TimeoutError):
+    """Raised when a call's end-to-end deadline runs out."""
+
+
+@dataclass
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one Orchestrator.
+
+    After ``failure_threshold`` consecutive 5xx/transport failures the
+    circuit opens and calls fail immediately for ``cooldown`` seconds.
+    Then a single probe call is let through (half-open): success closes
+    the circuit, failure opens it again.
+    """
+
+    name: str
+    failure_threshold: int = 5
+    cooldown: float = 30.0
+    state: str = CIRCUIT_CLOSED
+    failure_count: int = 0
+    opened_at: float = 0.0
+
+    def check(self) -> None:
+        """Allow the call through or raise CircuitOpenError."""
+        if self.state == CIRCUIT_CLOSED:
+            return
+        elapsed = time.monotonic() - self.opened_at
+        if elapsed < self.cooldown:
+            raise CircuitOpenError(
+                f"Orchestrator {self.name} is unavailable (circuit open), "
+                f"retry in {self.cooldown - elapsed:.0f}s"
+            )
+        # Cooldown over: this caller becomes the probe. Restarting the clock
+        # keeps other callers out until the probe finishes (or times out).
+        self.state = CIRCUIT_HALF_OPEN
+        self.opened_at = time.monotonic()
+
+    def record_success(self) -> None:
+        """Close the circuit after a call the server answered."""
+        if self.state != CIRCUIT_CLOSED:
+            logger.info(f"Circuit closed for {self.name}")
+        self.state = CIRCUIT_CLOSED
+        self.failure_count = 0
+
+    def record_failure(self) -> None:
+        """Count a 5xx/transport failure, opening the circuit at the threshold."""
+        self.failure_count += 1
+        if self.state == CIRCUIT_HALF_OPEN or self.failure_count >= self.failure_threshold:
+            if self.state != CIRCUIT_OPEN:
+                logger.warning(
+                    f"Circuit opened for {self.name} after {self.failure_count} failures"
+                )
+            self.state = CIRCUIT_OPEN
+            self.opened_at = time.monotonic()
+
+
+# Circuit breakers keyed by Orchestrator base URL
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(base_url: str) -> CircuitBreaker:
+    """Get the circuit breaker for an Orchestrator base URL."""
+    breaker = _breakers.get(base_url)
+    if breaker is None:
+        breaker = _breakers[base_url] = CircuitBreaker(base_url)
+    return breaker
+
+
+def get_bulkhead(base_url: str) -> asyncio.Semaphore:
+    """Get the semaphore capping concurrent requests to an Orchestrator.
+
+    Args:
+        base_url: Orchestrator base URL
+
+    Returns:
+        Semaphore with MAX_CONNECTIONS_PER_ORCHESTRATOR slots, shared by all
+        calls to ``base_url`` on the running event loop
+    """
+    loop = asyncio.get_running_loop()
+    bulkheads = _bulkheads.get(loop)
+    if bulkheads is None:
+        bulkheads = _bulkheads[loop] = {}
+    bulkhead = bulkheads.get(base_url)
+    if bulkhead is None:
+        bulkhead = bulkheads[base_url] = asyncio.Semaphore(MAX_CONNECTIONS_PER_ORCHESTRATOR)
+    return bulkhead
+
+
+def cache_get(key: Hashable, ttl: float) -> Optional[Any]:
+    """Get a cached parsed response if it is younger than ``ttl`` seconds.
+
+    Args:
+        key: Cache key (should include URL, token, folder and parameters)
+        ttl: Maximum age in seconds; 0 disables the lookup
+
+    Returns:
+        Cached value, or None on a miss
+    """
+    if ttl <= 0:
+        return None
+    entry = _response_cache.get(key)
+    if entry is None:
+        return None
+    stored_at, value = entry
+    if time.monotonic() - stored_at >= ttl:
+        return None
+    return value
+
+
+def cache_set(key: Hashable, value: Any) -> None:
+    """Store a parsed response in the short-lived cache.
+
+    Args:
+        key: Cache key
+        value: Parsed response; hand callers a copy (see copy_json) or an
+            immutable form, never the stored object itself
+    """
+    if len(_response_cache) >= _RESPONSE_CACHE_MAX_ENTRIES and key not in _response_cache:
+        # Evict the oldest entry (dicts keep insertion order)
+        del _response_cache[next(iter(_response_cache))]
+    _response_cache.pop(key, None)
+    _response_cache[key] = (time.monotonic(), value)
+
+
+def copy_json(value: Any) -> Any:
+    """Deep-copy a parsed JSON value.
+
+    Cached and single-flight results are shared, while callers (including
+    the executor, which adds "success") modify results in place. A JSON
+    round-trip through orjson is cheaper than copy.deepcopy for this data.
+
+    Args:
+        value: Dicts, lists and scalars as produced by json_loads
+
+    Returns:
+        Independent copy of ``value``
+    """
+    return json_loads(json_dumps(value))
+
+
+def cache_invalidate(match: Callable[[Hashable], bool]) -> int:
+    """Drop cached responses whose key satisfies ``match``.
+
+    Write paths call this so later reads don't serve stale data.
+
+    Args:
+        match: Predicate called with each cache key
+
+    Returns:
+        Number of entries removed
+    """
+    stale = [key for key in _response_cache if match(key)]
+    for key in stale:
+        del _response_cache[key]
+    return len(stale)
+
+
+async def single_flight(key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """Run ``fetch`` once for concurrent callers sharing the same key.
+
+    The request runs in its own task; every caller, the first included,
+    awaits it through asyncio.shield, so cancelling one caller never cancels
+    the request or fails the other callers.
+
+    Args:
+        key: Request key (same shape as the response cache key)
+        fetch: Zero-argument coroutine function performing the request
+
+    Returns:
+        Result of ``fetch`` (shared between callers, do not mutate)
+    """
+    loop = asyncio.get_running_loop()
+    task = _inflight.get(key)
+    if task is None or task.get_loop() is not loop:
+        task = _inflight[key] = loop.create_task(fetch())
+
+        def forget(done: "asyncio.Task[Any]") -> None:
+            if _inflight.get(key) is done:
+                del _inflight[key]
+            if not done.cancelled():
+                # Mark the exception retrieved in case every caller was cancelled
+                done.exception()
+
+        task.add_done_callback(forget)
+    return await asyncio.shield(task)
+
+
+@lru_cache(maxsize=64)
+def should_verify_ssl(base_url: str) -> bool:
+    """Decide whether to verify SSL for an Orchestrator URL.
+
+    UiPath Cloud (uipath.com) has valid certificates; on-premise installs
+    commonly use self-signed ones, so verification is disabled for them.
+
+    Args:
+        base_url: Orchestrator base URL
+
+    Returns:
+        True if the SSL certificate should be verified
+    """
+    return "uipath.com" in base_url.lower()
+
+
+@lru_cache(maxsize=32)
+def resolve_endpoint(base_url: str, path: str) -> str:
+    """Build the full API URL for an Orchestrator endpoint.
+
+    MSI installs serve the API at the root; Automation Suite and Cloud URLs
+    carry an org/tenant path and serve it under ``orchestrator_/``.
+
+    Args:
+        base_url: Orchestrator base URL without trailing slash
+        path: Endpoint path without leading slash (e.g., "odata/Folders")
+
+    Returns:
+        Full endpoint URL
+    """
+    if len(urlparse(base_url).path) <= 1:
+        # MSI or simple URL
+        return f"{base_url}/{path}"
+    # Automation Suite or Cloud
+    return f"{base_url}/orchestrator_/{path}"
+
+
+@lru_cache(maxsize=8)
+def bearer(access_token: str) -> str:
+    """Build the authorization header value for an access token.
+
+    Tokens are reused across many calls within a session, so the formatted
+    value is cached instead of being rebuilt per request.
+
+    Args:
+        access_token: UiPath access token
+
+    Returns:
+        "Bearer <token>" header value
+    """
+    return f"Bearer {access_token}"
+
+
+def get_client(verify_ssl: bool, orchestrator: bool = True) -> httpx.AsyncClient:
+    """Get the pooled AsyncClient for the running event loop.
+
+    Reusing the client keeps connections alive between tool calls, so
+    repeated calls against the same Orchestrator skip TCP/TLS setup. HTTP/2
+    is negotiated where the server supports it (UiPath Cloud does), letting
+    concurrent tool calls multiplex over a single connection.
+
+    Args:
+        verify_ssl: Whether to verify the server's SSL certificate
+        orchestrator: Whether the client talks to the Orchestrator API and
+            should send DEFAULT_HEADERS. Use False for pre-signed storage
+            URLs, which must only get the headers the caller sets.
+
+    Returns:
+        Shared httpx.AsyncClient (must not be closed by the caller)
+    """
+    loop = asyncio.get_running_loop()
+    clients = _clients.get(loop)
+    if clients is None:
+        clients = _clients[loop] = {}
+
+    key = (verify_ssl, orchestrator)
+    client = clients.get(key)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            verify=verify_ssl,
+            http2=True,
+            timeout=30.0,
+            headers=DEFAULT_HEADERS if orchestrator else None,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_CONNECTIONS_PER_ORCHESTRATOR,
+            ),
+        )
+        clients[key] = client
+        logger.debug(
+            f"Created pooled UiPath HTTP client (verify_ssl={verify_ssl}, orchestrator={orchestrator})"
+        )
+    return client
+
+
+async def close_clients() -> None:
+    """Close the pooled clients of the running event loop."""
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+def _retry_after(response: httpx.Response, cap: float) -> Optional[float]:
+    """Read a Retry-After header given in seconds, capped to ``cap``."""
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return min(cap, max(0.0, float(value)))
+    except ValueError:
+        # HTTP-date form is not used by Orchestrator; fall back to backoff
+        return None
+
+
+def deadline_after(seconds: Optional[float]) -> Optional[float]:
+    """Turn a relative time budget into an absolute monotonic deadline.
+
+    Args:
+        seconds: Time budget in seconds, or None for no deadline
+
+    Returns:
+        time.monotonic() based deadline, or None
+    """
+    if seconds is None:
+        return None
+    return time.monotonic() + seconds
+
+
+async def with_retry(
+    send: Callable[[], Awaitable[httpx.Response]],
+    *,
+    max_attempts: int = 4,
+    base: float = 0.25,
+    cap: float = 8.0,
+    breaker: Optional[CircuitBreaker] = None,
+    bulkhead: Optional[asyncio.Semaphore] = None,
+    deadline: Optional[float] = None,
+    parse: Optional[Callable[[httpx.Response], Awaitable[Any]]] = None,
+) -> Any:
+    """Send a request, retrying transient failures with jittered backoff.
+
+    Retries transport errors and RETRYABLE_STATUS_CODES responses, sleeping
+    a random delay in [0, min(cap, base * 2**attempt)] ("full jitter")
+    between attempts. A Retry-After header on the response takes precedence.
+
+    Args:
+        send: Zero-argument callable issuing the request
+        max_attempts: Maximum number of attempts including the first
+        base: Base delay in seconds
+        cap: Maximum delay in seconds
+        breaker: Optional circuit breaker checked before and updated after
+            every attempt
+        bulkhead: Optional semaphore held while each attempt is in flight
+            (released during backoff sleeps)
+        deadline: Optional time.monotonic() deadline (see deadline_after)
+            bounding all attempts, bulkhead waits and backoff sleeps together
+        parse: Optional coroutine function reading a successful response.
+            It runs inside the attempt, so reading a streamed body is held
+            to the bulkhead and deadline too, and transport errors while
+            reading are retried. It should close streamed responses.
+
+    Returns:
+        Successful (non-error) response, or the result of ``parse`` if given
+
+    Raises:
+        CircuitOpenError: The breaker is open
+        DeadlineExceededError: The deadline ran out before a response arrived
+        httpx.HTTPStatusError: Non-retryable status, or retries exhausted
+        httpx.TransportError: Transport failure after retries are exhausted
+    """
+
+    async def exchange() -> Tuple[httpx.Response, Any]:
+        response = await send()
+        if response.is_error:
+            # Load error bodies of streamed responses so callers can report
+            # them; this also releases the connection before a retry
+            await response.aread()
+            return response, None
+        return response, None if parse is None else await parse(response)
+
+    async def attempt_once() -> Tuple[httpx.Response, Any]:
+        if bulkhead is None:
+            return await exchange()
+        async with bulkhead:
+            return await exchange()
+
+    attempt = 0
+    while True:
+        attempt += 1
+        if breaker is not None:
+            breaker.check()
+        try:
+            if deadline is None:
+                response, parsed = await attempt_once()
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise DeadlineExceededError("UiPath API call deadline exceeded")
+                try:
+                    response, parsed = await asyncio.wait_for(attempt_once(), remaining)
+                except asyncio.TimeoutError:
+                    raise DeadlineExceededError("UiPath API call deadline exceeded") from None
+            logger.debug(
+                f"{response.request.method} {response.request.url} -> "
+                f"{response.status_code} ({response.http_version})"
+            )
+            if breaker is not None:
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            response.raise_for_status()
+            return response if parse is None else parsed
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_attempts:
+                raise
+            error: Exception = e
+            delay = _retry_after(e.response, cap)
+            reason = f"HTTP {e.response.status_code}"
+        except httpx.TransportError as e:
+            if breaker is not None:
+                breaker.record_failure()
+            if attempt >= max_attempts:
+                raise
+            error = e
+            delay = None
+            reason = type(e).__name__
+
+        if delay is None:
+            delay = random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            # No budget left for another attempt: surface the real failure
+            raise error
+        logger.warning(
+            f"Transient UiPath API failure ({reason}), retrying in {delay:.2f}s "
+            f"(attempt {attempt}/{max_attempts})"
+        )
+        await asyncio.sleep(delay)
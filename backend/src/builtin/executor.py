@@ -2,10 +2,57 @@
 
 import logging
 import importlib
-from typing import Dict, Any, Optional
+import inspect
+import functools
+from typing import Dict, Any, Optional, Callable, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Resolved built-in functions keyed by python_function path:
+# (module_path, function, is_coroutine_function)
+_resolved_functions: Dict[str, Tuple[str, Callable[..., Any], bool]] = {}
+
+
+def builtin_tool(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Mark a built-in function whose results already follow the tool convention.
+
+    Marked functions must always return a dictionary that includes a
+    "success" key; the executor then passes their results through as-is.
+    Unmarked functions are wrapped once at resolution time instead.
+    """
+    func.__builtin_tool__ = True
+    return func
+
+
+def _normalize_result(result: Any) -> Dict[str, Any]:
+    """Coerce a built-in's return value into a result dict with "success"."""
+    # Ensure result is a dictionary
+    if not isinstance(result, dict):
+        result = {"result": result}
+    
+    # Add success flag if not present; build a new dict, since the
+    # built-in may have returned an object it still holds on to
+    if "success" not in result:
+        result = {**result, "success": True}
+    
+    return result
+
+
+def _ensure_result_convention(func: Callable[..., Any], is_coro: bool) -> Callable[..., Any]:
+    """Wrap a non-compliant built-in so its results are normalized."""
+    if getattr(func, "__builtin_tool__", False):
+        return func
+    
+    if is_coro:
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            return _normalize_result(await func(**kwargs))
+    else:
+        @functools.wraps(func)
+        def wrapper(**kwargs):
+            return _normalize_result(func(**kwargs))
+    return wrapper
+
 
 async def execute_builtin_tool(
     python_function: str,
@@ -40,56 +87,65 @@ async def execute_builtin_tool(
         logger.info(f"Executing built-in tool: {python_function}")
         logger.debug(f"Arguments: {arguments}")
         
-        # Parse function path
-        parts = python_function.rsplit(".", 1)
-        if len(parts) != 2:
-            raise ValueError(f"Invalid function path: {python_function}")
-        
-        module_path, function_name = parts
-        
-        # Auto-prefix with src.builtin if not already prefixed
-        if not module_path.startswith("src.builtin"):
-            # Check if it starts with "builtin." (short form)
-            if module_path.startswith("builtin."):
-                # Replace "builtin." with "src.builtin."
-                module_path = f"src.{module_path}"
-                logger.debug(f"Converted builtin path to: {module_path}")
-            else:
-                # Add src.builtin prefix for other cases
-                module_path = f"src.builtin.{module_path}"
-                logger.debug(f"Auto-prefixed module path: {module_path}")
-        
-        # Import module
-        try:
-            module = importlib.import_module(module_path)
-        except ImportError as e:
-            logger.error(f"Failed to import module {module_path}: {e}")
-            return {
-                "success": False,
-                "error": "Module not found",
-                "message": f"Could not import module: {module_path}",
-                "details": str(e)
-            }
-        
-        # Get function
-        if not hasattr(module, function_name):
-            logger.error(f"Function {function_name} not found in module {module_path}")
-            return {
-                "success": False,
-                "error": "Function not found",
-                "message": f"Function '{function_name}' not found in module '{module_path}'"
-            }
-        
-        func = getattr(module, function_name)
-        
-        # Check if function is callable
-        if not callable(func):
-            logger.error(f"{function_name} is not callable")
-            return {
-                "success": False,
-                "error": "Not callable",
-                "message": f"'{function_name}' is not a callable function"
-            }
+        resolved = _resolved_functions.get(python_function)
+        if resolved is None:
+            # Parse function path
+            parts = python_function.rsplit(".", 1)
+            if len(parts) != 2:
+                raise ValueError(f"Invalid function path: {python_function}")
+            
+            module_path, function_name = parts
+            
+            # Auto-prefix with src.builtin if not already prefixed
+            if not module_path.startswith("src.builtin"):
+                # Check if it starts with "builtin." (short form)
+                if module_path.startswith("builtin."):
+                    # Replace "builtin." with "src.builtin."
+                    module_path = f"src.{module_path}"
+                    logger.debug(f"Converted builtin path to: {module_path}")
+                else:
+                    # Add src.builtin prefix for other cases
+                    module_path = f"src.builtin.{module_path}"
+                    logger.debug(f"Auto-prefixed module path: {module_path}")
+            
+            # Import module
+            try:
+                module = importlib.import_module(module_path)
+            except ImportError as e:
+                logger.error(f"Failed to import module {module_path}: {e}")
+                return {
+                    "success": False,
+                    "error": "Module not found",
+                    "message": f"Could not import module: {module_path}",
+                    "details": str(e)
+                }
+            
+            # Get function
+            if not hasattr(module, function_name):
+                logger.error(f"Function {function_name} not found in module {module_path}")
+                return {
+                    "success": False,
+                    "error": "Function not found",
+                    "message": f"Function '{function_name}' not found in module '{module_path}'"
+                }
+            
+            func = getattr(module, function_name)
+            
+            # Check if function is callable
+            if not callable(func):
+                logger.error(f"{function_name} is not callable")
+                return {
+                    "success": False,
+                    "error": "Not callable",
+                    "message": f"'{function_name}' is not a callable function"
+                }
+            
+            is_coro = inspect.iscoroutinefunction(func)
+            func = _ensure_result_convention(func, is_coro)
+            resolved = (module_path, func, is_coro)
+            _resolved_functions[python_function] = resolved
+        
+        module_path, func, is_coro = resolved
         
         # Add api_key to arguments if provided
         if api_key:
@@ -105,25 +161,16 @@ async def execute_builtin_tool(
                 logger.debug(f"Added access_token to arguments")
         
         # Execute function
-        logger.info(f"Calling {function_name} with arguments: {list(arguments.keys())}")
+        logger.info(f"Calling {python_function} with arguments: {list(arguments.keys())}")
         
-        # Check if function is async
-        import inspect
-        if inspect.iscoroutinefunction(func):
+        # Sync built-ins complete inline; only coroutine functions are awaited
+        if is_coro:
             result = await func(**arguments)
         else:
             result = func(**arguments)
         
         logger.info(f"Built-in tool execution completed: {python_function}")
         
-        # Ensure result is a dictionary
-        if not isinstance(result, dict):
-            result = {"result": result}
-        
-        # Add success flag if not present
-        if "success" not in result:
-            result["success"] = True
-        
         return result
         
     except TypeError as e:
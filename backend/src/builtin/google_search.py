@@ -4,9 +4,12 @@ import logging
 from typing import Dict, Any, Optional
 import httpx
 
+from .executor import builtin_tool
+
 logger = logging.getLogger(__name__)
 
 
+@builtin_tool
 async def google_search(q: str, api_key: Optional[str] = None) -> Dict[str, Any]:
     """
     Perform a Google search using the Custom Search JSON API.
@@ -4,26 +4,32 @@ This module provides tools for managing and querying UiPath Orchestrator folders
 """
 
 import httpx
+import ijson
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, NamedTuple
 from urllib.parse import urlparse
-import urllib3
 
-# Disable SSL warnings for self-signed certificates
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from ._uipath_common import bearer, get_client, should_verify_ssl
 
 logger = logging.getLogger(__name__)
 
 
-async def get_folders(
+class Folder(NamedTuple):
+    """Simplified UiPath folder record."""
+
+    id: str
+    name: str
+    full_name: str
+    description: str
+    type: str
+
+
+async def _fetch_folders(
     uipath_url: str,
     access_token: str,
     folder_name: Optional[str] = None,
-) -> List[Dict[str, Any]]:
-    """Get UiPath folders, optionally filtered by name.
-    
-    Retrieves folders from UiPath Orchestrator. If folder_name is provided,
-    filters results to folders matching the name (case-insensitive contains).
+) -> List[Folder]:
+    """Fetch UiPath folders as Folder records.
     
     Args:
         uipath_url: UiPath Orchestrator URL (e.g., https://orchestrator.local)
@@ -31,18 +37,7 @@ async def get_folders(
         folder_name: Optional folder name to search for (partial match)
         
     Returns:
-        List of folder dictionaries with id, name, full_name, description, type
-        
-    Example response:
-        [
-            {
-                "id": "1",
-                "name": "Shared",
-                "full_name": "Shared",
-                "description": "Default shared folder",
-                "type": "Personal"
-            }
-        ]
+        List of Folder records
     """
     # Normalize URL
     base_url = uipath_url.rstrip('/')
@@ -56,9 +51,9 @@ async def get_folders(
         # Automation Suite or Cloud
         api_url = f"{base_url}/orchestrator_/odata/Folders"
     
+    # Static headers come from the pooled client; only auth varies per call
     headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json",
+        "authorization": bearer(access_token),
     }
     
     # Build OData filter if folder_name is provided
@@ -75,29 +70,38 @@ async def get_folders(
     
     try:
         # Determine if SSL verification should be disabled
-        verify_ssl = "uipath.com" in base_url.lower()
+        verify_ssl = should_verify_ssl(base_url)
         
-        async with httpx.AsyncClient(verify=verify_ssl, timeout=30.0) as client:
-            logger.info(f"Fetching folders from: {api_url}")
-            response = await client.get(api_url, headers=headers, params=params)
+        client = get_client(verify_ssl)
+        logger.info(f"Fetching folders from: {api_url}")
+        async with client.stream("GET", api_url, headers=headers, params=params) as response:
+            if response.is_error:
+                # Error bodies are small; load them so the handler below can report them
+                await response.aread()
             response.raise_for_status()
-            
-            data = response.json()
-            folders = data.get("value", [])
-            
+                
+            # Parse "value" items incrementally as chunks arrive instead of
+            # buffering the whole body, so peak memory stays flat on large tenants
+            folders = ijson.sendable_list()
+            parser = ijson.items_coro(folders, "value.item", use_float=True)
+                
             # Transform to simplified format
             result = []
-            for folder in folders:
-                result.append({
-                    "id": str(folder.get("Id", "")),
-                    "name": str(folder.get("DisplayName", folder.get("Name", ""))),
-                    "full_name": str(folder.get("FullyQualifiedName", "")),
-                    "description": str(folder.get("Description", "")),
-                    "type": str(folder.get("Type", "")),
-                })
+            async for chunk in response.aiter_bytes():
+                parser.send(chunk)
+                for folder in folders:
+                    result.append(Folder(
+                        str(folder.get("Id", "")),
+                        str(folder.get("DisplayName", folder.get("Name", ""))),
+                        str(folder.get("FullyQualifiedName", "")),
+                        str(folder.get("Description", "")),
+                        str(folder.get("Type", "")),
+                    ))
+                del folders[:]
+            parser.close()
             
-            logger.info(f"Successfully retrieved {len(result)} folders")
-            return result
+        logger.info(f"Successfully retrieved {len(result)} folders")
+        return result
             
     except httpx.HTTPStatusError as e:
         error_msg = f"HTTP error occurred: {e.response.status_code} - {e.response.text}"
@@ -113,6 +117,40 @@ async def get_folders(
         raise Exception(error_msg)
 
 
+async def get_folders(
+    uipath_url: str,
+    access_token: str,
+    folder_name: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Get UiPath folders, optionally filtered by name.
+    
+    Retrieves folders from UiPath Orchestrator. If folder_name is provided,
+    filters results to folders matching the name (case-insensitive contains).
+    
+    Args:
+        uipath_url: UiPath Orchestrator URL (e.g., https://orchestrator.local)
+        access_token: UiPath access token for authentication
+        folder_name: Optional folder name to search for (partial match)
+        
+    Returns:
+        List of folder dictionaries with id, name, full_name, description, type
+        
+    Example response:
+        [
+            {
+                "id": "1",
+                "name": "Shared",
+                "full_name": "Shared",
+                "description": "Default shared folder",
+                "type": "Personal"
+            }
+        ]
+    """
+    folders = await _fetch_folders(uipath_url, access_token, folder_name)
+    # Convert to dicts only at the tool boundary, where results are JSON-serialized
+    return [folder._asdict() for folder in folders]
+
+
 async def get_folder_id_by_name(
     uipath_url: str,
     access_token: str,
@@ -141,7 +179,7 @@ async def get_folder_id_by_name(
     """
     try:
         # Get all folders matching the name
-        folders = await get_folders(
+        folders = await _fetch_folders(
             uipath_url=uipath_url,
             access_token=access_token,
             folder_name=folder_name,
@@ -150,15 +188,15 @@ async def get_folder_id_by_name(
         # Find exact match (case-insensitive)
         folder_name_lower = folder_name.lower()
         for folder in folders:
-            if folder["name"].lower() == folder_name_lower:
-                logger.info(f"Found folder '{folder_name}' with ID: {folder['id']}")
-                return folder["id"]
+            if folder.name.lower() == folder_name_lower:
+                logger.info(f"Found folder '{folder_name}' with ID: {folder.id}")
+                return folder.id
         
         # If no exact match, check full_name
         for folder in folders:
-            if folder["full_name"].lower() == folder_name_lower:
-                logger.info(f"Found folder by full name '{folder_name}' with ID: {folder['id']}")
-                return folder["id"]
+            if folder.full_name.lower() == folder_name_lower:
+                logger.info(f"Found folder by full name '{folder_name}' with ID: {folder.id}")
+                return folder.id
         
         logger.warning(f"Folder '{folder_name}' not found")
         return None
@@ -5,15 +5,16 @@ This module provides tools for monitoring UiPath Orchestrator jobs.
 
 import httpx
 import logging
+from operator import itemgetter
 from typing import Dict, Any, Optional, List
 from urllib.parse import urlparse
-import urllib3
 
-# Disable SSL warnings for self-signed certificates
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from ._uipath_common import bearer, get_client, json_loads, should_verify_ssl
 
 logger = logging.getLogger(__name__)
 
+_count = itemgetter("count")
+
 
 async def get_jobs_stats(
     uipath_url: str,
@@ -52,35 +53,36 @@ async def get_jobs_stats(
         api_url = f"{base_url}/orchestrator_/api/Stats/GetJobsStats"        
     #api_url = f"{base_url}/api/Stats/GetJobsStats"
     
+    # Static headers come from the pooled client; only auth/folder vary per call
     headers = {
-        "accept": "application/json",
-        "authorization": f"Bearer {access_token}",
-        "content-type": "application/json",
-        "x-uipath-orchestrator": "true",
+        "authorization": bearer(access_token),
     }
     
     try:
         # Determine if SSL verification should be disabled
-        verify_ssl = "uipath.com" in base_url.lower()
+        verify_ssl = should_verify_ssl(base_url)
         
-        async with httpx.AsyncClient(verify=verify_ssl, timeout=30.0) as client:
-            logger.info(f"Fetching job stats from: {api_url}")
-            response = await client.get(api_url, headers=headers)
-            response.raise_for_status()
+        client = get_client(verify_ssl)
+        logger.info(f"Fetching job stats from: {api_url}")
+        response = await client.get(api_url, headers=headers)
+        response.raise_for_status()
             
-            stats = response.json()
+        stats = json_loads(response.content)
             
-            # Calculate total
+        # Calculate total (every status bucket normally carries "count")
+        try:
+            total = sum(map(_count, stats))
+        except KeyError:
             total = sum(item.get("count", 0) for item in stats)
             
-            result = {
-                "stats": stats,
-                "total": total,
-                "url": base_url
-            }
+        result = {
+            "stats": stats,
+            "total": total,
+            "url": base_url
+        }
             
-            logger.info(f"Successfully retrieved job stats: {total} total jobs")
-            return result
+        logger.info(f"Successfully retrieved job stats: {total} total jobs")
+        return result
             
     except httpx.HTTPStatusError as e:
         error_msg = f"HTTP error occurred: {e.response.status_code} - {e.response.text}"
@@ -143,11 +145,9 @@ async def get_finished_jobs_evolution(
         # Automation Suite or Cloud
         api_url = f"{base_url}/orchestrator_/monitoring/JobsMonitoring/GetFinishedJobsEvolution"
     
+    # Static headers come from the pooled client; only auth/folder vary per call
     headers = {
-        "accept": "application/json",
-        "authorization": f"Bearer {access_token}",
-        "content-type": "application/json",
-        "x-uipath-orchestrator": "true",
+        "authorization": bearer(access_token),
         "x-uipath-organizationunitid": str(folder_id),
     }
     
@@ -157,17 +157,17 @@ async def get_finished_jobs_evolution(
     
     try:
         # Determine if SSL verification should be disabled
-        verify_ssl = "uipath.com" in base_url.lower()
+        verify_ssl = should_verify_ssl(base_url)
         
-        async with httpx.AsyncClient(verify=verify_ssl, timeout=30.0) as client:
-            logger.info(f"Fetching job evolution from: {api_url} (timeFrame: {time_frame_minutes} minutes)")
-            response = await client.get(api_url, headers=headers, params=params)
-            response.raise_for_status()
+        client = get_client(verify_ssl)
+        logger.info(f"Fetching job evolution from: {api_url} (timeFrame: {time_frame_minutes} minutes)")
+        response = await client.get(api_url, headers=headers, params=params)
+        response.raise_for_status()
             
-            evolution = response.json()
+        evolution = json_loads(response.content)
             
-            logger.info(f"Successfully retrieved job evolution: {len(evolution)} data points")
-            return evolution
+        logger.info(f"Successfully retrieved job evolution: {len(evolution)} data points")
+        return evolution
             
     except httpx.HTTPStatusError as e:
         error_msg = f"HTTP error occurred: {e.response.status_code} - {e.response.text}"
@@ -241,12 +241,10 @@ async def get_processes_table(
         # Automation Suite or Cloud
         api_url = f"{base_url}/orchestrator_/monitoring/JobsMonitoring/GetProcessesTable"    
     
+    # Static headers come from the pooled client; only auth/folder vary per call
     headers = {
-        "accept": "application/json",
-        "authorization": f"Bearer {access_token}",
-        "content-type": "application/json",
-        "x-uipath-orchestrator": "true",
-        "x-uipath-organizationunitid" : str(folder_id),
+        "authorization": bearer(access_token),
+        "x-uipath-organizationunitid": str(folder_id),
     }
 
     params = {
@@ -259,17 +257,17 @@ async def get_processes_table(
     
     try:
         # Determine if SSL verification should be disabled
-        verify_ssl = "uipath.com" in base_url.lower()
+        verify_ssl = should_verify_ssl(base_url)
         
-        async with httpx.AsyncClient(verify=verify_ssl, timeout=30.0) as client:
-            logger.info(f"Fetching processes table from: {api_url} (page: {page_no}, size: {page_size})")
-            response = await client.get(api_url, headers=headers, params=params)
-            response.raise_for_status()
+        client = get_client(verify_ssl)
+        logger.info(f"Fetching processes table from: {api_url} (page: {page_no}, size: {page_size})")
+        response = await client.get(api_url, headers=headers, params=params)
+        response.raise_for_status()
             
-            result = response.json()
+        result = json_loads(response.content)
             
-            logger.info(f"Successfully retrieved processes table: {result.get('total', 0)} total processes, {len(result.get('data', []))} in current page")
-            return result
+        logger.info(f"Successfully retrieved processes table: {result.get('total', 0)} total processes, {len(result.get('data', []))} in current page")
+        return result
             
     except httpx.HTTPStatusError as e:
         error_msg = f"HTTP error occurred: {e.response.status_code} - {e.response.text}"
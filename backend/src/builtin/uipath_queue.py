@@ -3,24 +3,69 @@
 This module provides tools for monitoring UiPath Orchestrator queues.
 """
 
+import asyncio
 import httpx
+import ijson
 import logging
+import math
+import time
 from typing import Dict, Any, Optional, List
-import urllib3
-from urllib.parse import urlparse
-import json
 
-# Disable SSL warnings for self-signed certificates
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from ._uipath_common import (
+    bearer,
+    cache_get,
+    cache_set,
+    copy_json,
+    deadline_after,
+    get_breaker,
+    get_bulkhead,
+    get_client,
+    json_loads,
+    resolve_endpoint,
+    should_verify_ssl,
+    single_flight,
+    UiPathAPIError,
+    with_retry,
+)
+from .uipath_schedule import get_process_schedules
 
 logger = logging.getLogger(__name__)
 
+# GetQueuesHealthState body; only the time frame varies (sent as a string)
+_HEALTH_STATE_BODY = b'{"timeFrameMinutes":"%d"}'
+
+# GetQueuesTable query parameters that never change (fixed sort order)
+_QUEUES_TABLE_PARAMS = {
+    "orderBy": "queueName",
+    "direction": "asc",
+}
+
+
+async def _parse_queues_table(response: httpx.Response) -> Dict[str, Any]:
+    """Parse a streamed GetQueuesTable response and close it.
+    
+    The body is parsed incrementally as chunks arrive instead of being
+    buffered first, so raw bytes and parsed rows are never both held in
+    full for large folders.
+    """
+    pairs = ijson.sendable_list()
+    parser = ijson.kvitems_coro(pairs, "", use_float=True)
+    try:
+        async for chunk in response.aiter_bytes(65536):
+            parser.send(chunk)
+        parser.close()
+    finally:
+        await response.aclose()
+    return dict(pairs)
+
 
 async def get_queues_health_state(
     uipath_url: str,
     access_token: str,
     folder_id: int,
     time_frame_minutes: int = 1440,
+    cache_ttl: float = 5.0,
+    deadline_s: Optional[float] = None,
 ) -> Dict[str, Any]:
     """Get queues health state from UiPath Orchestrator.
     
@@ -32,6 +77,8 @@ async def get_queues_health_state(
         access_token: UiPath access token for authentication
         folder_id: Folder ID (organization unit ID)
         time_frame_minutes: Time frame in minutes (default: 1440 = 24 hours)
+        cache_ttl: Seconds to reuse an identical recent response (0 disables caching)
+        deadline_s: Optional time budget in seconds for the whole call, retries included
         
     Returns:
         Dictionary containing queues health state data
@@ -54,55 +101,68 @@ async def get_queues_health_state(
             "total": null
         }
     """
+    # Start the clock before any waiting (cache, single-flight, bulkhead)
+    deadline = deadline_after(deadline_s)
+    
     # Normalize URL
     base_url = uipath_url.rstrip('/')
     # Construct API endpoint
-    parsed = urlparse(base_url)
-    if len(parsed.path) <= 1:
-        # MSI or simple URL
-        api_url = f"{base_url}/monitoring/QueuesMonitoring/GetQueuesHealthState"
-    else:
-        # Automation Suite or Cloud
-        api_url = f"{base_url}/orchestrator_/monitoring/QueuesMonitoring/GetQueuesHealthState"        
+    api_url = resolve_endpoint(base_url, "monitoring/QueuesMonitoring/GetQueuesHealthState")
     
+    # Static headers come from the pooled client; only auth/folder vary per call
     headers = {
-        "accept": "application/json",
-        "authorization": f"Bearer {access_token}",
-        "content-type": "application/json",
-        "x-uipath-orchestrator": "true",
+        "authorization": bearer(access_token),
         "x-uipath-organizationunitid": str(folder_id),
     }
     
-    body = {
-        "timeFrameMinutes": str(time_frame_minutes)
-    }
+    body = _HEALTH_STATE_BODY % int(time_frame_minutes)
+    
+    # Identical calls within cache_ttl seconds reuse the parsed response
+    cache_key = (api_url, access_token, folder_id, time_frame_minutes)
+    cached = cache_get(cache_key, cache_ttl)
+    if cached is not None:
+        logger.info(f"Returning cached queues health state (folder: {folder_id})")
+        return copy_json(cached)
     
     try:
-        # Determine if SSL verification should be disabled
-        verify_ssl = "uipath.com" in base_url.lower()
+        client = get_client(should_verify_ssl(base_url))
         
-        async with httpx.AsyncClient(verify=verify_ssl, timeout=30.0) as client:
+        async def fetch():
             logger.info(f"Fetching queues health state from: {api_url}")
-            response = await client.post(api_url, headers=headers, json=body)
-            response.raise_for_status()
-            
-            result = response.json()
+            response = await with_retry(
+                lambda: client.post(api_url, headers=headers, content=body),
+                breaker=get_breaker(base_url),
+                bulkhead=get_bulkhead(base_url),
+                deadline=deadline,
+            )
+            return json_loads(response.content)
+        
+        # Concurrent identical calls share one request
+        result = await single_flight(cache_key, fetch)
             
-            logger.info(f"Successfully retrieved queues health state: {len(result.get('data', []))} queues")
-            return result
+        logger.info(f"Successfully retrieved queues health state: {len(result.get('data', []))} queues")
+        if cache_ttl > 0:
+            cache_set(cache_key, result)
+        # The result is shared with the cache and concurrent callers
+        return copy_json(result)
             
+    except UiPathAPIError as e:
+        # Circuit open or deadline exceeded
+        logger.error("%s", e)
+        raise
     except httpx.HTTPStatusError as e:
-        error_msg = f"HTTP error occurred: {e.response.status_code} - {e.response.text}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
+        # The body is only decoded if the error gets formatted
+        error = UiPathAPIError("HTTP error occurred", e.response)
+        logger.error("%s", error)
+        raise error from e
     except httpx.RequestError as e:
-        error_msg = f"Request error occurred: {str(e)}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
-    except Exception as e:
-        error_msg = f"Unexpected error: {str(e)}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
+        error = UiPathAPIError(f"Request error occurred: {e}")
+        logger.error("%s", error)
+        raise error from e
+    except ValueError as e:
+        error = UiPathAPIError(f"Invalid response: {e}")
+        logger.error("%s", error)
+        raise error from e
 
 
 async def get_queues_table(
@@ -112,6 +172,8 @@ async def get_queues_table(
     time_frame_minutes: int = 1440,
     page_no: int = 1,
     page_size: int = 100,
+    cache_ttl: float = 5.0,
+    deadline_s: Optional[float] = None,
 ) -> Dict[str, Any]:
     """Get queues table with statistics from UiPath Orchestrator.
     
@@ -125,6 +187,8 @@ async def get_queues_table(
         time_frame_minutes: Time frame in minutes (default: 1440 = 24 hours)
         page_no: Page number (default: 1)
         page_size: Number of items per page (default: 100)
+        cache_ttl: Seconds to reuse an identical recent response (0 disables caching)
+        deadline_s: Optional time budget in seconds for the whole call, retries included
         
     Returns:
         Dictionary containing queues data and total count
@@ -147,59 +211,185 @@ async def get_queues_table(
             "total": 2
         }
     """
+    # Start the clock before any waiting (cache, single-flight, bulkhead)
+    deadline = deadline_after(deadline_s)
+    
     # Normalize URL
     base_url = uipath_url.rstrip('/')
     # Construct API endpoint
-    parsed = urlparse(base_url)
-    if len(parsed.path) <= 1:
-        # MSI or simple URL
-        api_url = f"{base_url}/monitoring/QueuesMonitoring/GetQueuesTable"
-    else:
-        # Automation Suite or Cloud
-        api_url = f"{base_url}/orchestrator_/monitoring/QueuesMonitoring/GetQueuesTable"   
+    api_url = resolve_endpoint(base_url, "monitoring/QueuesMonitoring/GetQueuesTable")
     
+    # Static headers come from the pooled client; only auth/folder vary per call
     headers = {
-        "accept": "application/json",
-        "authorization": f"Bearer {access_token}",
-        "content-type": "application/json",
-        "x-uipath-orchestrator": "true",
-        "x-uipath-organizationunitid": str(folder_id),   
+        "authorization": bearer(access_token),
+        "x-uipath-organizationunitid": str(folder_id),
     }
     
     params = {
         "timeFrameMinutes": time_frame_minutes,
         "pageNo": page_no,
         "pageSize": page_size,
-        "orderBy": "queueName",
-        "direction": "asc",
+        **_QUEUES_TABLE_PARAMS,
     }
     
+    # Identical calls within cache_ttl seconds reuse the parsed response
+    cache_key = (api_url, access_token, folder_id, time_frame_minutes, page_no, page_size)
+    cached = cache_get(cache_key, cache_ttl)
+    if cached is not None:
+        logger.info(f"Returning cached queues table (folder: {folder_id})")
+        return copy_json(cached)
+    
     try:
-        # Determine if SSL verification should be disabled
-        verify_ssl = "uipath.com" in base_url.lower()
+        client = get_client(should_verify_ssl(base_url))
         
-        async with httpx.AsyncClient(verify=verify_ssl, timeout=30.0) as client:
+        async def fetch():
             logger.info(f"Fetching queues table from: {api_url} (page: {page_no}, size: {page_size})")
-            response = await client.get(api_url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            result = response.json()
+            return await with_retry(
+                lambda: client.send(
+                    client.build_request("GET", api_url, headers=headers, params=params),
+                    stream=True,
+                ),
+                breaker=get_breaker(base_url),
+                bulkhead=get_bulkhead(base_url),
+                deadline=deadline,
+                # Read the body within the same bulkhead slot and deadline
+                parse=_parse_queues_table,
+            )
+        
+        # Concurrent identical calls share one request
+        result = await single_flight(cache_key, fetch)
             
-            logger.info(f"Successfully retrieved queues table: {result.get('total', 0)} total queues, {len(result.get('data', []))} in current page")
-            return result
+        logger.info(f"Successfully retrieved queues table: {result.get('total', 0)} total queues, {len(result.get('data', []))} in current page")
+        if cache_ttl > 0:
+            cache_set(cache_key, result)
+        # The result is shared with the cache and concurrent callers
+        return copy_json(result)
             
+    except UiPathAPIError as e:
+        # Circuit open or deadline exceeded
+        logger.error("%s", e)
+        raise
     except httpx.HTTPStatusError as e:
-        error_msg = f"HTTP error occurred: {e.response.status_code} - {e.response.text}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
+        # The body is only decoded if the error gets formatted
+        error = UiPathAPIError("HTTP error occurred", e.response)
+        logger.error("%s", error)
+        raise error from e
     except httpx.RequestError as e:
-        error_msg = f"Request error occurred: {str(e)}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
-    except Exception as e:
-        error_msg = f"Unexpected error: {str(e)}"
+        error = UiPathAPIError(f"Request error occurred: {e}")
+        logger.error("%s", error)
+        raise error from e
+    except (ValueError, ijson.JSONError) as e:
+        error = UiPathAPIError(f"Invalid response: {e}")
+        logger.error("%s", error)
+        raise error from e
+
+
+async def get_all_queues_table(
+    uipath_url: str,
+    access_token: str,
+    folder_id: int,
+    time_frame_minutes: int = 1440,
+    page_size: int = 100,
+    max_concurrency: int = 8,
+    cache_ttl: float = 5.0,
+    deadline_s: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Get every page of the queues table from UiPath Orchestrator.
+    
+    Fetches the first page to learn the total, then requests the remaining
+    pages concurrently (at most ``max_concurrency`` at a time) instead of
+    one after another.
+    
+    Args:
+        uipath_url: UiPath Orchestrator URL (e.g., https://orchestrator.local)
+        access_token: UiPath access token for authentication
+        folder_id: Folder ID (organization unit ID)
+        time_frame_minutes: Time frame in minutes (default: 1440 = 24 hours)
+        page_size: Number of items per request (default: 100)
+        max_concurrency: Maximum number of pages fetched at once (default: 8)
+        cache_ttl: Seconds to reuse an identical recent response (0 disables caching)
+        deadline_s: Optional time budget in seconds for the whole call, retries included
+        
+    Returns:
+        Dictionary with all queues in "data" and the total count, in the
+        same shape as get_queues_table, or an error dictionary when
+        page_size is not positive
+    """
+    if page_size < 1:
+        error_msg = f"page_size must be at least 1, got {page_size}"
         logger.error(error_msg)
-        raise Exception(error_msg)
+        return {
+            "success": False,
+            "error": error_msg,
+        }
+    
+    deadline = deadline_after(deadline_s)
+    
+    def remaining() -> Optional[float]:
+        return None if deadline is None else deadline - time.monotonic()
+    
+    first = await get_queues_table(
+        uipath_url, access_token, folder_id, time_frame_minutes,
+        page_no=1, page_size=page_size, cache_ttl=cache_ttl, deadline_s=remaining(),
+    )
+    total = first.get("total") or 0
+    n_pages = math.ceil(total / page_size)
+    
+    # Bound concurrency so large folders don't trip Orchestrator rate limits
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def fetch_page(page_no: int) -> Dict[str, Any]:
+        async with semaphore:
+            return await get_queues_table(
+                uipath_url, access_token, folder_id, time_frame_minutes,
+                page_no=page_no, page_size=page_size, cache_ttl=cache_ttl,
+                deadline_s=remaining(),
+            )
+    
+    pages = await asyncio.gather(*(fetch_page(p) for p in range(2, n_pages + 1)))
+    
+    # Each page is the caller's own copy, so the first page's list is extended in place
+    data = first.get("data", [])
+    for page in pages:
+        data.extend(page.get("data", []))
+    
+    logger.info(f"Successfully retrieved all queues: {len(data)} queues in {max(n_pages, 1)} pages")
+    return {"data": data, "total": total}
+
+
+async def get_folder_monitoring_snapshot(
+    uipath_url: str,
+    access_token: str,
+    folder_id: int,
+    time_frame_minutes: int = 1440,
+    deadline_s: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Get queue health, queue statistics and process schedules of a folder at once.
+    
+    The three requests run concurrently, so the call takes about as long as
+    the slowest of them instead of their sum.
+    
+    Args:
+        uipath_url: UiPath Orchestrator URL (e.g., https://orchestrator.local)
+        access_token: UiPath access token for authentication
+        folder_id: Folder ID (organization unit ID)
+        time_frame_minutes: Time frame in minutes (default: 1440 = 24 hours)
+        deadline_s: Optional time budget in seconds for the whole call, retries included
+        
+    Returns:
+        Dictionary with "health" (get_queues_health_state), "table"
+        (get_queues_table, first page) and "schedules" (get_process_schedules)
+    """
+    health, table, schedules = await asyncio.gather(
+        get_queues_health_state(
+            uipath_url, access_token, folder_id, time_frame_minutes, deadline_s=deadline_s,
+        ),
+        get_queues_table(
+            uipath_url, access_token, folder_id, time_frame_minutes, deadline_s=deadline_s,
+        ),
+        get_process_schedules(uipath_url, access_token, folder_id, deadline_s=deadline_s),
+    )
+    return {"health": health, "table": table, "schedules": schedules}
 
 
 # Tool definitions for MCP
@@ -253,5 +443,51 @@ TOOLS = [
             "required": ["folder_id"]
         },
         "function": get_queues_table
+    },
+    {
+        "name": "uipath_get_all_queues_table",
+        "description": "Get the statistics table of all queues in a folder from UiPath Orchestrator, fetching every page at once (item counts, SLA status, average handling time, and estimated completion time)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "time_frame_minutes": {
+                    "type": "integer",
+                    "description": "Time frame in minutes (default: 1440 = 24 hours)",
+                    "default": 1440
+                },
+                "page_size": {
+                    "type": "integer",
+                    "description": "Number of items per request (default: 100)",
+                    "default": 100,
+                    "minimum": 1
+                },
+                "folder_id": {
+                    "type": "integer",
+                    "description": "Folder ID (organization unit ID) - required"
+                }
+            },
+            "required": ["folder_id"]
+        },
+        "function": get_all_queues_table
+    },
+    {
+        "name": "uipath_get_folder_monitoring_snapshot",
+        "description": "Get a monitoring snapshot of a folder from UiPath Orchestrator in one call: queue health states, the queues statistics table (first page), and process schedules",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "time_frame_minutes": {
+                    "type": "integer",
+                    "description": "Time frame in minutes (default: 1440 = 24 hours)",
+                    "default": 1440
+                },
+                "folder_id": {
+                    "type": "integer",
+                    "description": "Folder ID (organization unit ID) - required"
+                }
+            },
+            "required": ["folder_id"]
+        },
+        "function": get_folder_monitoring_snapshot
     }
 ]
@@ -5,21 +5,64 @@ This module provides tools for monitoring UiPath Orchestrator process schedules.
 
 import httpx
 import logging
-from typing import Dict, Any, Optional, List
-from urllib.parse import urlparse
-import urllib3
+from typing import Dict, Any, Optional, List, NamedTuple
 
-# Disable SSL warnings for self-signed certificates
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from ._uipath_common import (
+    bearer,
+    cache_get,
+    cache_set,
+    deadline_after,
+    get_breaker,
+    get_bulkhead,
+    get_client,
+    json_loads,
+    resolve_endpoint,
+    should_verify_ssl,
+    single_flight,
+    UiPathAPIError,
+    with_retry,
+)
 
 logger = logging.getLogger(__name__)
 
+class Schedule(NamedTuple):
+    """Simplified UiPath process schedule record."""
+
+    enabled: bool
+    name: str
+    release_name: str
+    cron_summary: str
+    next_occurrence: str
+    time_zone: str
+
+
+# (ProcessSchedule field, default) for each Schedule attribute, in order
+_FIELDS = (
+    ("Enabled", False),
+    ("Name", ""),
+    ("ReleaseName", ""),
+    ("StartProcessCronSummary", ""),
+    ("StartProcessNextOccurrence", ""),
+    ("TimeZoneId", "UTC"),
+)
+
+# OData $select so Orchestrator only sends the fields above
+_SELECT = ",".join(field for field, _ in _FIELDS)
+
+# ProcessSchedules query parameters that never change
+_SCHEDULE_PARAMS = {
+    "$orderby": "Name asc",
+    "$select": _SELECT,
+}
+
 
 async def get_process_schedules(
     uipath_url: str,
     access_token: str,
     folder_id: int,
     top: int = 100,
+    cache_ttl: float = 5.0,
+    deadline_s: Optional[float] = None,
 ) -> List[Dict[str, Any]]:
     """Get process schedules from UiPath Orchestrator.
     
@@ -31,6 +74,8 @@ async def get_process_schedules(
         access_token: UiPath access token for authentication
         folder_id: Folder ID (organization unit ID) - required
         top: Maximum number of schedules to return (default: 100)
+        cache_ttl: Seconds to reuse an identical recent response (0 disables caching)
+        deadline_s: Optional time budget in seconds for the whole call, retries included
         
     Returns:
         List of schedule dictionaries with selected fields
@@ -46,69 +91,75 @@ async def get_process_schedules(
             }
         ]
     """
+    # Start the clock before any waiting (cache, single-flight, bulkhead)
+    deadline = deadline_after(deadline_s)
+    
     # Normalize URL
     base_url = uipath_url.rstrip('/')
     
     # Determine API endpoint based on URL structure
-    parsed = urlparse(base_url)
-    if len(parsed.path) <= 1:
-        # MSI or simple URL
-        api_url = f"{base_url}/odata/ProcessSchedules"
-    else:
-        # Automation Suite or Cloud
-        api_url = f"{base_url}/orchestrator_/odata/ProcessSchedules"
+    api_url = resolve_endpoint(base_url, "odata/ProcessSchedules")
     
+    # Static headers come from the pooled client; only auth/folder vary per call
     headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json",
-        "x-uipath-orchestrator": "true",
+        "authorization": bearer(access_token),
         "x-uipath-organizationunitid": str(folder_id),
     }
     
-    params = {
-        "$top": top,
-        "$orderby": "Name asc",
-    }
+    params = {"$top": top, **_SCHEDULE_PARAMS}
+    
+    # Identical calls within cache_ttl seconds reuse the parsed response
+    cache_key = (api_url, access_token, folder_id, top)
+    cached = cache_get(cache_key, cache_ttl)
+    if cached is not None:
+        logger.info(f"Returning cached process schedules (folder: {folder_id})")
+        return [schedule._asdict() for schedule in cached]
     
     try:
-        # Determine if SSL verification should be disabled
-        verify_ssl = "uipath.com" in base_url.lower()
+        client = get_client(should_verify_ssl(base_url))
         
-        async with httpx.AsyncClient(verify=verify_ssl, timeout=30.0) as client:
+        async def fetch():
             logger.info(f"Fetching process schedules from: {api_url} (folder: {folder_id})")
-            response = await client.get(api_url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
+            response = await with_retry(
+                lambda: client.get(api_url, headers=headers, params=params),
+                breaker=get_breaker(base_url),
+                bulkhead=get_bulkhead(base_url),
+                deadline=deadline,
+            )
+            data = json_loads(response.content)
             schedules = data.get("value", [])
             
             # Extract only the required fields
-            result = []
-            for schedule in schedules:
-                result.append({
-                    "enabled": schedule.get("Enabled", False),
-                    "name": schedule.get("Name", ""),
-                    "release_name": schedule.get("ReleaseName", ""),
-                    "cron_summary": schedule.get("StartProcessCronSummary", ""),
-                    "next_occurrence": schedule.get("StartProcessNextOccurrence", ""),
-                    "time_zone": schedule.get("TimeZoneId", "UTC"),
-                })
+            return [
+                Schedule._make(schedule.get(field, default) for field, default in _FIELDS)
+                for schedule in schedules
+            ]
+        
+        # Concurrent identical calls share one request
+        result = await single_flight(cache_key, fetch)
             
-            logger.info(f"Successfully retrieved {len(result)} process schedules")
-            return result
+        logger.info(f"Successfully retrieved {len(result)} process schedules")
+        if cache_ttl > 0:
+            cache_set(cache_key, result)
+        return [schedule._asdict() for schedule in result]
             
+    except UiPathAPIError as e:
+        # Circuit open or deadline exceeded
+        logger.error("%s", e)
+        raise
     except httpx.HTTPStatusError as e:
-        error_msg = f"HTTP error occurred: {e.response.status_code} - {e.response.text}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
+        # The body is only decoded if the error gets formatted
+        error = UiPathAPIError("HTTP error occurred", e.response)
+        logger.error("%s", error)
+        raise error from e
     except httpx.RequestError as e:
-        error_msg = f"Request error occurred: {str(e)}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
-    except Exception as e:
-        error_msg = f"Unexpected error: {str(e)}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
+        error = UiPathAPIError(f"Request error occurred: {e}")
+        logger.error("%s", error)
+        raise error from e
+    except ValueError as e:
+        error = UiPathAPIError(f"Invalid response: {e}")
+        logger.error("%s", error)
+        raise error from e
 
 
 # Tool definitions for MCP
@@ -4,18 +4,61 @@ This module provides tools for managing and querying UiPath Orchestrator storage
 Storage buckets are used to store files and documents in UiPath Orchestrator.
 """
 
+import asyncio
 import httpx
 import logging
+import os
+import stat
+import uuid
 from typing import Dict, Any, Optional, List
-from urllib.parse import urlparse, quote
-import urllib3
+from urllib.parse import urlsplit, quote
 import aiofiles
 
-# Disable SSL warnings for self-signed certificates
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from ._uipath_common import (
+    bearer,
+    cache_get,
+    cache_invalidate,
+    cache_set,
+    copy_json,
+    get_client,
+    json_loads,
+    resolve_endpoint,
+    should_verify_ssl,
+    single_flight,
+    UiPathAPIError,
+)
+from .executor import builtin_tool
 
 logger = logging.getLogger(__name__)
 
+# Bucket lists rarely change; identical lookups within this many seconds
+# are answered from memory
+BUCKETS_CACHE_TTL = 10.0
+
+# URL-encoded forms of the most common upload content types
+_ENCODED_CONTENT_TYPES = {
+    content_type: quote(content_type)
+    for content_type in (
+        "application/octet-stream",
+        "application/pdf",
+        "application/json",
+        "image/png",
+        "image/jpeg",
+        "text/plain",
+        "text/csv",
+    )
+}
+
+# Read size for streamed uploads
+_UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+async def _iter_file(path: str, chunk_size: int = _UPLOAD_CHUNK_SIZE):
+    """Yield a file's content in chunks so uploads never hold it whole in memory."""
+    async with aiofiles.open(path, 'rb') as f:
+        while chunk := await f.read(chunk_size):
+            yield chunk
+
 
 async def get_storage_buckets(
     uipath_url: str,
@@ -25,6 +68,8 @@ async def get_storage_buckets(
     top: int = 100,
     skip: int = 0,
     orderby: str = "Name asc",
+    cache_ttl: float = BUCKETS_CACHE_TTL,
+    as_raw: bool = False,
 ) -> Dict[str, Any]:
     """Get UiPath storage buckets, optionally filtered by name.
     
@@ -39,6 +84,9 @@ async def get_storage_buckets(
         top: Maximum number of results to return (default: 100)
         skip: Number of results to skip for pagination (default: 0)
         orderby: OData orderby clause (default: "Name asc")
+        cache_ttl: Seconds to reuse an identical recent response (0 disables caching)
+        as_raw: Return the OData bucket entities unchanged instead of the
+            simplified format below (skips the per-bucket conversion)
         
     Returns:
         Dictionary containing buckets list and total count
@@ -72,20 +120,12 @@ async def get_storage_buckets(
     base_url = uipath_url.rstrip('/')
     
     # Determine API endpoint based on URL structure
-    parsed = urlparse(base_url)
-    if len(parsed.path) <= 1:
-        # MSI or simple URL
-        api_url = f"{base_url}/odata/Buckets"
-    else:
-        # Automation Suite or Cloud
-        api_url = f"{base_url}/orchestrator_/odata/Buckets"
+    api_url = resolve_endpoint(base_url, "odata/Buckets")
     
+    # Static headers come from the pooled client; only auth/folder vary per call
     headers = {
-        "accept": "application/json",
-        "authorization": f"Bearer {access_token}",
-        "content-type": "application/json",
-        "x-uipath-orchestrator": "true",
-        "x-uipath-organizationunitid": str(organization_unit_id),
+        "authorization": bearer(access_token),
+        "x-uipath-organizationunitid": str(folder_id),
     }
     
     # Build OData query parameters
@@ -103,53 +143,88 @@ async def get_storage_buckets(
         params["$filter"] = f"contains(Name,'{escaped}')"
         logger.info(f"Searching buckets with filter: contains(Name,'{escaped}')")
     
+    # Identical calls within cache_ttl seconds reuse the parsed response
+    cache_key = (api_url, access_token, folder_id, bucket_name, top, skip, orderby, as_raw)
+    cached = cache_get(cache_key, cache_ttl)
+    if cached is not None:
+        logger.info(f"Returning cached storage buckets (folder: {folder_id})")
+        return copy_json(cached)
+    
     try:
-        # Determine if SSL verification should be disabled
-        verify_ssl = "uipath.com" in base_url.lower()
+        client = get_client(should_verify_ssl(base_url))
         
-        async with httpx.AsyncClient(verify=verify_ssl, timeout=30.0) as client:
+        async def fetch():
             logger.info(f"Fetching storage buckets from: {api_url}")
             response = await client.get(api_url, headers=headers, params=params)
             response.raise_for_status()
             
-            data = response.json()
+            data = json_loads(response.content)
             buckets_raw = data.get("value", [])
             total_count = data.get("@odata.count", len(buckets_raw))
             
-            # Transform to simplified format
-            buckets = []
-            for bucket in buckets_raw:
-                buckets.append({
-                    "id": bucket.get("Id"),
-                    "name": bucket.get("Name", ""),
-                    "description": bucket.get("Description", ""),
-                    "identifier": bucket.get("Identifier", ""),
-                    "folders_count": bucket.get("FoldersCount", 0),
-                    "storage_provider": bucket.get("StorageProvider"),
-                    "storage_container": bucket.get("StorageContainer"),
-                    "options": bucket.get("Options", "None"),
-                })
+            if as_raw:
+                buckets = buckets_raw
+            else:
+                # Transform to simplified format
+                buckets = [
+                    {
+                        "id": bucket.get("Id"),
+                        "name": bucket.get("Name", ""),
+                        "description": bucket.get("Description", ""),
+                        "identifier": bucket.get("Identifier", ""),
+                        "folders_count": bucket.get("FoldersCount", 0),
+                        "storage_provider": bucket.get("StorageProvider"),
+                        "storage_container": bucket.get("StorageContainer"),
+                        "options": bucket.get("Options", "None"),
+                    }
+                    for bucket in buckets_raw
+                ]
             
-            result = {
+            return {
                 "count": total_count,
                 "buckets": buckets,
             }
-            
-            logger.info(f"Successfully retrieved {len(buckets)} storage buckets (total: {total_count})")
-            return result
+        
+        # Concurrent identical lookups share one request
+        result = await single_flight(cache_key, fetch)
+        
+        logger.info(f"Successfully retrieved {len(result['buckets'])} storage buckets (total: {result['count']})")
+        if cache_ttl > 0:
+            cache_set(cache_key, result)
+        # The result is shared with the cache and concurrent callers
+        return copy_json(result)
             
     except httpx.HTTPStatusError as e:
-        error_msg = f"HTTP error occurred: {e.response.status_code} - {e.response.text}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
+        # The body is only decoded if the error gets formatted
+        error = UiPathAPIError("HTTP error occurred", e.response)
+        logger.error("%s", error)
+        raise error from e
     except httpx.RequestError as e:
-        error_msg = f"Request error occurred: {str(e)}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
-    except Exception as e:
-        error_msg = f"Unexpected error: {str(e)}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
+        error = UiPathAPIError(f"Request error occurred: {e}")
+        logger.error("%s", error)
+        raise error from e
+    except ValueError as e:
+        error = UiPathAPIError(f"Invalid response: {e}")
+        logger.error("%s", error)
+        raise error from e
+
+
+def clear_storage_buckets_cache(folder_id: Optional[int] = None) -> int:
+    """Forget cached storage bucket lists.
+    
+    Call after creating, renaming or deleting buckets so the next lookup
+    goes to Orchestrator.
+    
+    Args:
+        folder_id: Only clear lists of this folder (default: all folders)
+        
+    Returns:
+        Number of cached lists removed
+    """
+    return cache_invalidate(
+        lambda key: str(key[0]).endswith("/odata/Buckets")
+        and (folder_id is None or key[2] == folder_id)
+    )
 
 
 async def get_storage_bucket_by_name(
@@ -203,6 +278,7 @@ async def get_storage_bucket_by_name(
         raise
 
 
+@builtin_tool
 async def upload_file_to_storage_bucket(
     uipath_url: str,
     access_token: str, 
@@ -259,16 +335,16 @@ async def upload_file_to_storage_bucket(
             content_type="application/pdf"
         )
     """
-    import os
-    import aiofiles
-    
     headers = {
         "content-type": content_type,
     }
     
     try:
-        # Check if file exists
-        if not os.path.exists(local_file_path):
+        # One stat call answers exists / is-a-file / size. File system calls
+        # run in a thread: on network mounts they can block for a while.
+        try:
+            file_stat = await asyncio.to_thread(os.stat, local_file_path)
+        except FileNotFoundError:
             error_msg = f"File not found: {local_file_path}"
             logger.error(error_msg)
             return {
@@ -277,7 +353,7 @@ async def upload_file_to_storage_bucket(
             }
         
         # Check if it's a file (not a directory)
-        if not os.path.isfile(local_file_path):
+        if not stat.S_ISREG(file_stat.st_mode):
             error_msg = f"Path is not a file: {local_file_path}"
             logger.error(error_msg)
             return {
@@ -285,43 +361,47 @@ async def upload_file_to_storage_bucket(
                 "error": error_msg,
             }
         
-        # Get file size
-        file_size = os.path.getsize(local_file_path)
+        # Get file size (sent as Content-Length so the body is not chunk-encoded)
+        file_size = file_stat.st_size
+        headers["content-length"] = str(file_size)
         
-        # Read file content
-        async with aiofiles.open(local_file_path, 'rb') as f:
-            file_content = await f.read()
+        # Decide SSL verification by host: upload URLs carry a one-off token,
+        # so the memoized check is keyed on the host part only
+        verify_ssl = should_verify_ssl(urlsplit(upload_url).netloc)
         
-        # Determine if SSL verification should be disabled
-        # Check if it's a local/self-signed certificate
-        verify_ssl = "uipath.com" in upload_url.lower()
+        # Pre-signed storage URL: no Orchestrator default headers
+        client = get_client(verify_ssl, orchestrator=False)
+        logger.info(f"Uploading file '{local_file_path}' to storage bucket (size: {file_size} bytes)")
+        # Stream the file from disk as it is sent
+        response = await client.put(
+            upload_url,
+            headers=headers,
+            content=_iter_file(local_file_path),
+            timeout=300.0,
+        )
+        response.raise_for_status()
+        
+        # Upload successful - delete local file
+        try:
+            await asyncio.to_thread(os.remove, local_file_path)
+            logger.info(f"Deleted local file after successful upload: {local_file_path}")
+            file_deleted = True
+        except Exception as delete_error:
+            logger.warning(f"Failed to delete local file '{local_file_path}': {delete_error}")
+            file_deleted = False
+        
+        result = {
+            "success": True,
+            "message": "File uploaded successfully",
+            "status_code": response.status_code,
+            "size_bytes": file_size,
+            "local_file_path": local_file_path,
+            "file_deleted": file_deleted,
+        }
+        
+        logger.info(f"Successfully uploaded file '{local_file_path}' ({file_size} bytes)")
+        return result
         
-        async with httpx.AsyncClient(verify=verify_ssl, timeout=300.0) as client:
-            logger.info(f"Uploading file '{local_file_path}' to storage bucket (size: {file_size} bytes)")
-            response = await client.put(upload_url, headers=headers, content=file_content)
-            response.raise_for_status()
-            
-            # Upload successful - delete local file
-            try:
-                os.remove(local_file_path)
-                logger.info(f"Deleted local file after successful upload: {local_file_path}")
-                file_deleted = True
-            except Exception as delete_error:
-                logger.warning(f"Failed to delete local file '{local_file_path}': {delete_error}")
-                file_deleted = False
-            
-            result = {
-                "success": True,
-                "message": "File uploaded successfully",
-                "status_code": response.status_code,
-                "size_bytes": file_size,
-                "local_file_path": local_file_path,
-                "file_deleted": file_deleted,
-            }
-            
-            logger.info(f"Successfully uploaded file '{local_file_path}' ({file_size} bytes)")
-            return result
-            
     except httpx.HTTPStatusError as e:
         error_msg = f"HTTP error occurred: {e.response.status_code} - {e.response.text}"
         logger.error(error_msg)
@@ -386,8 +466,8 @@ async def get_storage_bucket_upload_url(
             "uri": "https://orchestrator.local/api/BlobFileAccess/Put?t=...",
             "verb": "PUT",
             "headers": {},
-            "directory": "a1b2c3d4-e5f6-7890-abcd-ef1234567890",
-            "full_path": "a1b2c3d4-e5f6-7890-abcd-ef1234567890/report.pdf"
+            "directory": "a1b2c3d4e5f67890abcdef1234567890",
+            "full_path": "a1b2c3d4e5f67890abcdef1234567890/report.pdf"
         }
         
     Example usage:
@@ -395,7 +475,7 @@ async def get_storage_bucket_upload_url(
         upload_info = await get_storage_bucket_upload_url(
             uipath_url="https://orchestrator.local",
             access_token="token",
-            organization_unit_id=1,
+            folder_id=1,
             bucket_id=1,
             file_name="report.pdf",
             content_type="application/pdf"
@@ -425,12 +505,14 @@ async def get_storage_bucket_upload_url(
             directory=upload_info1["directory"]  # reuse directory
         )
     """
-    import uuid
-    
     # Generate directory if not provided
     if not directory:
-        directory = str(uuid.uuid4())
+        directory = uuid.uuid4().hex
         logger.info(f"Generated directory UUID: {directory}")
+        # Hex digits never need escaping
+        encoded_directory = directory
+    else:
+        encoded_directory = quote(directory)
     
     # Normalize URL
     base_url = uipath_url.rstrip('/')
@@ -439,64 +521,55 @@ async def get_storage_bucket_upload_url(
     full_path = f"{directory}/{file_name}"
     
     # Encode file path for URL
-    # Note: UiPath expects backslash as path separator
-    encoded_path = quote(f"\\{full_path}")
-    encoded_content_type = quote(content_type)
+    # Note: UiPath expects backslash (%5C) as path separator
+    encoded_path = f"%5C{encoded_directory}/{quote(file_name)}"
+    encoded_content_type = _ENCODED_CONTENT_TYPES.get(content_type) or quote(content_type)
     
     # Determine API endpoint based on URL structure
-    parsed = urlparse(base_url)
-    if len(parsed.path) <= 1:
-        # MSI or simple URL
-        api_url = f"{base_url}/odata/Buckets({bucket_id})/UiPath.Server.Configuration.OData.GetWriteUri"
-    else:
-        # Automation Suite or Cloud
-        api_url = f"{base_url}/orchestrator_/odata/Buckets({bucket_id})/UiPath.Server.Configuration.OData.GetWriteUri"
+    buckets_url = resolve_endpoint(base_url, "odata/Buckets")
+    api_url = f"{buckets_url}({bucket_id})/UiPath.Server.Configuration.OData.GetWriteUri"
     
     # Add query parameters
     api_url = f"{api_url}?path={encoded_path}&contentType={encoded_content_type}"
     
+    # Static headers come from the pooled client; only auth/folder vary per call
     headers = {
-        "accept": "application/json",
-        "authorization": f"Bearer {access_token}",
-        "content-type": "application/json",
-        "x-uipath-orchestrator": "true",
+        "authorization": bearer(access_token),
         "x-uipath-organizationunitid": str(folder_id),
     }
     
     try:
-        # Determine if SSL verification should be disabled
-        verify_ssl = "uipath.com" in base_url.lower()
+        client = get_client(should_verify_ssl(base_url))
+        logger.info(f"Getting upload URL for bucket {bucket_id}, path: {full_path}")
+        response = await client.get(api_url, headers=headers)
+        response.raise_for_status()
+        
+        data = json_loads(response.content)
+        
+        result = {
+            "uri": data.get("Uri", ""),
+            "verb": data.get("Verb", "PUT"),
+            "headers": data.get("Headers", {}),
+            "directory": directory,
+            "full_path": full_path,
+        }
+        
+        logger.info(f"Successfully generated upload URL for {full_path} (directory: {directory})")
+        return result
         
-        async with httpx.AsyncClient(verify=verify_ssl, timeout=30.0) as client:
-            logger.info(f"Getting upload URL for bucket {bucket_id}, path: {full_path}")
-            response = await client.get(api_url, headers=headers)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            result = {
-                "uri": data.get("Uri", ""),
-                "verb": data.get("Verb", "PUT"),
-                "headers": data.get("Headers", {}),
-                "directory": directory,
-                "full_path": full_path,
-            }
-            
-            logger.info(f"Successfully generated upload URL for {full_path} (directory: {directory})")
-            return result
-            
     except httpx.HTTPStatusError as e:
-        error_msg = f"HTTP error occurred: {e.response.status_code} - {e.response.text}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
+        # The body is only decoded if the error gets formatted
+        error = UiPathAPIError("HTTP error occurred", e.response)
+        logger.error("%s", error)
+        raise error from e
     except httpx.RequestError as e:
-        error_msg = f"Request error occurred: {str(e)}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
-    except Exception as e:
-        error_msg = f"Unexpected error: {str(e)}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
+        error = UiPathAPIError(f"Request error occurred: {e}")
+        logger.error("%s", error)
+        raise error from e
+    except ValueError as e:
+        error = UiPathAPIError(f"Invalid response: {e}")
+        logger.error("%s", error)
+        raise error from e
 
 
 # Tool definitions for MCP
@@ -4,60 +4,189 @@ This module automatically discovers and registers built-in tools from the builti
 It uses a simple version-based migration system to avoid duplicate registrations.
 """
 
+import asyncio
 import os
+import sys
 import importlib
 import logging
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
 from pathlib import Path
 
+from .database import json_dumps
+
 logger = logging.getLogger(__name__)
 
 # Built-in tools version - increment this when adding/modifying tools
-BUILTIN_TOOLS_VERSION = 6
+BUILTIN_TOOLS_VERSION = 8
+
+# Cached result of discover_builtin_tools()
+_discovered_tools: Optional[List[Dict[str, Any]]] = None
+
+# Upper bound on threads used to import builtin modules
+MAX_IMPORT_WORKERS = 8
+
+# Package of the builtin modules; tool functions are stored relative to it
+BUILTIN_PACKAGE_PREFIX = "src.builtin."
+
+# Files in builtin/ that never define tools
+EXCLUDED_FILES = frozenset({"__init__.py", "executor.py"})
+
+
+def _import_builtin_module(stem: str):
+    """Import one builtin module, returning the exception instead of raising it.
+    
+    Args:
+        stem: Module file name without the .py suffix
+        
+    Returns:
+        The imported module, or the exception raised while importing it
+    """
+    module_name = f"{BUILTIN_PACKAGE_PREFIX}{stem}"
+    try:
+        # Already-imported modules are reused
+        return sys.modules.get(module_name) or importlib.import_module(module_name)
+    except Exception as e:
+        return e
 
 
-async def discover_builtin_tools() -> List[Dict[str, Any]]:
+def discover_builtin_tools(refresh: bool = False) -> List[Dict[str, Any]]:
     """Discover all built-in tools from builtin/ directory.
     
     Scans all Python files in the builtin/ directory and imports their TOOLS definitions.
+    The result is cached for the life of the process, since modules are only
+    imported once anyway.
+    
+    Args:
+        refresh: Rescan the directory instead of returning the cached result
     
     Returns:
         List of tool definitions from all builtin modules
     """
+    global _discovered_tools
+    if _discovered_tools is not None and not refresh:
+        return list(_discovered_tools)
+    
     tools = []
     builtin_dir = Path(__file__).parent / "builtin"
     
-    # Find all Python files in builtin directory (excluding __init__.py and executor.py)
-    python_files = [
-        f for f in builtin_dir.glob("*.py")
-        if f.name not in ["__init__.py", "executor.py"]
-        and not f.name.startswith("_")
-    ]
+    # Find all Python files in builtin directory (excluding __init__.py, executor.py
+    # and private helpers). scandir gives names and types without extra stat calls.
+    with os.scandir(builtin_dir) as entries:
+        module_stems = sorted(
+            entry.name[:-3] for entry in entries
+            if entry.name.endswith(".py")
+            and entry.name not in EXCLUDED_FILES
+            and not entry.name.startswith("_")
+            and entry.is_file()
+        )
     
-    logger.info(f"Scanning {len(python_files)} builtin modules for TOOLS definitions")
+    logger.info(f"Scanning {len(module_stems)} builtin modules for TOOLS definitions")
     
-    for py_file in python_files:
-        module_name = f"src.builtin.{py_file.stem}"
-        try:
-            # Import the module
-            module = importlib.import_module(module_name)
-            
-            # Check if module has TOOLS definition
-            if hasattr(module, "TOOLS"):
-                module_tools = getattr(module, "TOOLS")
-                if isinstance(module_tools, list):
-                    tools.extend(module_tools)
-                    logger.info(f"  ✓ {py_file.name}: Found {len(module_tools)} tools")
-                else:
-                    logger.warning(f"  ✗ {py_file.name}: TOOLS is not a list")
+    # Module imports are mostly file I/O, so they overlap well on a thread
+    # pool; map() keeps the results in directory order
+    with ThreadPoolExecutor(
+        max_workers=min(MAX_IMPORT_WORKERS, len(module_stems) or 1),
+        thread_name_prefix="builtin-import",
+    ) as executor:
+        modules = list(executor.map(_import_builtin_module, module_stems))
+    
+    seen: Dict[str, Dict[str, Any]] = {}
+    for stem, module in zip(module_stems, modules):
+        if isinstance(module, Exception):
+            logger.error("  ✗ %s.py: Failed to import - %s", stem, module)
+            continue
+        
+        # Check if module has TOOLS definition
+        if hasattr(module, "TOOLS"):
+            module_tools = getattr(module, "TOOLS")
+            if isinstance(module_tools, list):
+                for tool in module_tools:
+                    # A module re-exporting another module's tools must not
+                    # register them twice; the first definition wins
+                    name = tool.get("name")
+                    if name in seen:
+                        if seen[name] is not tool:
+                            logger.warning("  ✗ %s.py: Duplicate tool name %s ignored", stem, name)
+                        continue
+                    seen[name] = tool
+                    tools.append(tool)
+                logger.info("  ✓ %s.py: Found %d tools", stem, len(module_tools))
             else:
-                logger.debug(f"  - {py_file.name}: No TOOLS definition")
-                
-        except Exception as e:
-            logger.error(f"  ✗ {py_file.name}: Failed to import - {e}")
+                logger.warning("  ✗ %s.py: TOOLS is not a list", stem)
+        else:
+            logger.debug("  - %s.py: No TOOLS definition", stem)
     
     logger.info(f"Discovered {len(tools)} total built-in tools")
-    return tools
+    _discovered_tools = tools
+    return list(tools)
+
+
+@lru_cache(maxsize=None)
+def _function_path(func) -> str:
+    """Return the python_function path of a tool function.
+    
+    Builtin modules are stored relative to src.builtin
+    (e.g., "uipath_folder.get_folders"), which is what the executor expects.
+    """
+    module_name = func.__module__
+    if module_name.startswith(BUILTIN_PACKAGE_PREFIX):
+        module_name = module_name[len(BUILTIN_PACKAGE_PREFIX):]
+    return f"{module_name}.{func.__name__}"
+
+
+def _resolve_python_function(tool: Dict[str, Any]) -> Optional[str]:
+    """Resolve the python_function of a tool definition.
+    
+    Args:
+        tool: Tool definition from a TOOLS list
+        
+    Returns:
+        The explicit python_function, the path of the tool's function,
+        or None if neither is present
+    """
+    python_function = tool.get("python_function")
+    if not python_function and "function" in tool:
+        func = tool["function"]
+        python_function = _function_path(func) if callable(func) else str(func)
+    return python_function
+
+
+def _builtin_tool_row(tool: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Build the database row of one built-in tool.
+    
+    Args:
+        tool: Tool definition from a TOOLS list
+        
+    Returns:
+        Row for Database.upsert_builtin_tools, or None if the tool has no
+        python_function
+        
+    Raises:
+        KeyError, TypeError, ValueError: The definition is incomplete or its
+            input_schema cannot be serialized; checked here so one bad tool
+            cannot fail the whole batch
+    """
+    name = tool["name"]
+    description = tool["description"]
+    if not isinstance(name, str) or not name:
+        raise ValueError(f"Invalid tool name: {name!r}")
+    if not isinstance(description, str):
+        raise ValueError("Tool description must be a string")
+    
+    python_function = _resolve_python_function(tool)
+    if not python_function:
+        logger.error("  ✗ Failed to register %s: No python_function found", name)
+        return None
+    
+    return {
+        "name": name,
+        "description": description,
+        # Serialized up front; the database stores JSON text as given
+        "input_schema": json_dumps(tool["input_schema"]),
+        "python_function": python_function,
+    }
 
 
 async def register_builtin_tools(db) -> int:
@@ -72,8 +201,6 @@ async def register_builtin_tools(db) -> int:
     Returns:
         Number of tools registered
     """
-    from .database import Database
-    
     logger.info("=== Built-in Tools Registration ===")
     
     # Check current version in database
@@ -84,67 +211,51 @@ async def register_builtin_tools(db) -> int:
         logger.info("Built-in tools are up to date, skipping registration")
         return 0
     
-    # Discover all tools
-    tools = await discover_builtin_tools()
+    # Discover all tools; importing modules is blocking I/O, so keep it off
+    # the event loop while the rest of startup proceeds
+    tools = await asyncio.to_thread(discover_builtin_tools)
     
     if not tools:
         logger.warning("No built-in tools found to register")
         return 0
     
-    # Register each tool
-    registered_count = 0
-    skipped_count = 0
+    # Load existing names with one query, only to report what changes
+    existing_names = {
+        row["name"]
+        for row in await db.list_builtin_tools(active_only=False, include_schema=False)
+    }
     
+    rows = []
+    skipped_count = 0
     for tool in tools:
         try:
-            # Extract python_function from function object or string
-            python_function = tool.get("python_function")
-            if not python_function and "function" in tool:
-                # Get function name from function object
-                func = tool["function"]
-                if callable(func):
-                    # Get module and function name
-                    module_name = func.__module__
-                    func_name = func.__name__
-                    # Convert to relative path format (e.g., "uipath_folder.get_folders")
-                    if module_name.startswith("src.builtin."):
-                        module_name = module_name.replace("src.builtin.", "")
-                    python_function = f"{module_name}.{func_name}"
-                else:
-                    python_function = str(func)
-            
-            if not python_function:
-                logger.error(f"  ✗ Failed to register {tool['name']}: No python_function found")
-                skipped_count += 1
-                continue
-            
-            # Check if tool already exists
-            existing = await db.get_builtin_tool_by_name(tool["name"])
-            
-            if existing:
-                # Update existing tool
-                await db.update_builtin_tool(
-                    tool_id=existing["id"],
-                    description=tool["description"],
-                    input_schema=tool["input_schema"],
-                    python_function=python_function,
-                )
-                logger.info(f"  ↻ Updated: {tool['name']}")
-                registered_count += 1
-            else:
-                # Create new tool
-                await db.create_builtin_tool(
-                    name=tool["name"],
-                    description=tool["description"],
-                    input_schema=tool["input_schema"],
-                    python_function=python_function,
-                )
-                logger.info(f"  ✓ Registered: {tool['name']}")
-                registered_count += 1
-                
+            row = _builtin_tool_row(tool)
         except Exception as e:
-            logger.error(f"  ✗ Failed to register {tool['name']}: {e}")
+            logger.error("  ✗ Failed to register %s: %s", tool.get("name"), e)
+            row = None
+        if row is None:
             skipped_count += 1
+            continue
+        rows.append(row)
+        if row["name"] in existing_names:
+            logger.info("  ↻ Updated: %s", row["name"])
+        else:
+            logger.info("  ✓ Registered: %s", row["name"])
+    
+    # Write every tool in one transaction instead of one round trip per tool
+    try:
+        registered_count = await db.upsert_builtin_tools(rows)
+    except Exception as e:
+        # The batch was rolled back; retry tool by tool so only the
+        # offending tools are skipped
+        logger.error("  ✗ Batch registration failed (%s), registering tools one by one", e)
+        registered_count = 0
+        for row in rows:
+            try:
+                registered_count += await db.upsert_builtin_tools([row])
+            except Exception as row_error:
+                logger.error("  ✗ Failed to register %s: %s", row["name"], row_error)
+                skipped_count += 1
     
     # Update version in database
     await db.set_builtin_tools_version(BUILTIN_TOOLS_VERSION)
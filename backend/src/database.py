@@ -1,29 +1,296 @@
 """Database module for managing MCP server endpoints, tools, and users."""
 
 import aiosqlite
-import json
+import asyncio
+import bcrypt
 import hashlib
+import hmac
+import json
+import logging
 import os
-from typing import List, Optional, Dict, Any
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple, Union
+
+try:
+    import orjson
+
+    json_loads = orjson.loads
+
+    def json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:  # pragma: no cover - orjson is a declared dependency
+    json_loads = json.loads
+    json_dumps = json.dumps
+
+logger = logging.getLogger(__name__)
+
+
+def _dump_schema(schema: Union[str, Dict[str, Any]]) -> str:
+    """Serialize an input schema for storage.
+
+    Schemas that are already JSON text are stored as given, so callers
+    holding the serialized form skip a dumps call.
+    """
+    if isinstance(schema, str):
+        return schema
+    return json_dumps(schema)
+
+
+@lru_cache(maxsize=64)
+def _update_sql(table: str, columns: Tuple[str, ...], where: str) -> str:
+    """Build an UPDATE statement for one combination of changed columns.
+
+    Cached so repeated updates of the same columns reuse one SQL string.
+    """
+    assignments = "".join(f"{column} = ?, " for column in columns)
+    return f"UPDATE {table} SET {assignments}updated_at = CURRENT_TIMESTAMP WHERE {where}"
+
+
+# Applied to every connection. WAL lets readers run while a write is in
+# progress, and synchronous=NORMAL is still crash-safe in WAL mode while
+# skipping an fsync per commit. page_size only takes effect on a new
+# database file, where 8 KB pages keep most tool schemas on one page, and
+# must come before journal_mode.
+CONNECTION_PRAGMAS = """
+PRAGMA page_size=8192;
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA cache_size=-64000;
+PRAGMA mmap_size=268435456;
+PRAGMA temp_store=MEMORY;
+PRAGMA foreign_keys=ON;
+"""
+
+# Connections kept open per Database; they are reused across calls so the
+# pragmas above and SQLite's page cache survive between queries.
+POOL_SIZE = 8
+
+# Prepared statements each pooled connection keeps, keyed by SQL text.
+# Queries are written as fixed strings so repeated calls reuse the compiled
+# statement instead of preparing it again.
+STATEMENT_CACHE_SIZE = 256
+
+# Stored in PRAGMA user_version once the columns below are present
+SCHEMA_VERSION = 1
+
+# Columns added after the first release. Fresh databases get them from the
+# CREATE TABLE statements; older files are upgraded once.
+LEGACY_COLUMN_MIGRATIONS = (
+    "ALTER TABLE users ADD COLUMN uipath_client_id TEXT",
+    "ALTER TABLE users ADD COLUMN uipath_client_secret TEXT",
+    "ALTER TABLE users ADD COLUMN uipath_auth_type TEXT DEFAULT 'pat'",
+    "ALTER TABLE mcp_tools ADD COLUMN uipath_process_key TEXT",
+    "ALTER TABLE mcp_tools ADD COLUMN tool_type TEXT DEFAULT 'uipath'",
+    "ALTER TABLE mcp_tools ADD COLUMN builtin_tool_id INTEGER",
+    "ALTER TABLE builtin_tools ADD COLUMN api_key TEXT",
+)
+
+# Columns returned by the user, server, tool and built-in tool getters, in
+# SELECT order
+USER_COLUMNS = (
+    "id",
+    "username",
+    "email",
+    "hashed_password",
+    "role",
+    "is_active",
+    "uipath_url",
+    "uipath_auth_type",
+    "uipath_access_token",
+    "uipath_client_id",
+    "uipath_client_secret",
+    "uipath_folder_path",
+    "created_at",
+    "updated_at",
+)
+SERVER_COLUMNS = (
+    "id",
+    "tenant_name",
+    "server_name",
+    "description",
+    "user_id",
+    "created_at",
+    "updated_at",
+)
+TOOL_COLUMNS = (
+    "id",
+    "server_id",
+    "name",
+    "description",
+    "input_schema",
+    "tool_type",
+    "uipath_process_name",
+    "uipath_process_key",
+    "uipath_folder_path",
+    "uipath_folder_id",
+    "builtin_tool_id",
+    "created_at",
+    "updated_at",
+)
+BUILTIN_TOOL_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "input_schema",
+    "python_function",
+    "api_key",
+    "is_active",
+    "created_at",
+    "updated_at",
+)
+
+USER_SELECT = f"SELECT {', '.join(USER_COLUMNS)} FROM users"
+SERVER_SELECT = f"SELECT {', '.join(SERVER_COLUMNS)} FROM mcp_servers"
+TOOL_SELECT = f"SELECT {', '.join(TOOL_COLUMNS)} FROM mcp_tools"
+BUILTIN_TOOL_SELECT = f"SELECT {', '.join(BUILTIN_TOOL_COLUMNS)} FROM builtin_tools"
+
+# Rows per multi-row INSERT; 10 parameters each keeps a statement under
+# SQLite's historical 999 host-parameter limit
+BULK_INSERT_ROWS = 90
+
+# Parsed tool input schemas kept per Database, keyed by the stored JSON text
+SCHEMA_CACHE_SIZE = 1024
+
+# Seconds a built-in tool looked up by name is served from memory; bounds
+# staleness when another process (e.g. a maintenance script) edits the table
+BUILTIN_NAME_CACHE_TTL = 30.0
+
+# bcrypt work factor; each step doubles the cost of hashing a password
+BCRYPT_ROUNDS = 12
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with a salted bcrypt hash.
+
+    bcrypt only uses the first 72 bytes of the password.
+
+    Args:
+        password: Plain text password
+
+    Returns:
+        bcrypt hash string
+    """
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode()[:72], salt).decode()
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    """Check a password against a stored hash.
+
+    Accounts created before bcrypt was introduced store an unsalted SHA-256
+    hex digest; those are still accepted.
+
+    Args:
+        plain_password: Plain text password
+        hashed_password: Stored hash
+
+    Returns:
+        True if password matches
+    """
+    if hashed_password.startswith("$2"):
+        return bcrypt.checkpw(plain_password.encode()[:72], hashed_password.encode())
+    legacy = hashlib.sha256(plain_password.encode()).hexdigest()
+    return hmac.compare_digest(legacy, hashed_password)
 
 
 class Database:
     """SQLite database manager for MCP servers, tools, and users."""
 
-    def __init__(self, db_path: str = "database/mcp_servers.db"):
+    # (column, transform) pairs for the partial updaters; None means the
+    # value is stored as given
+    _TOOL_UPDATE_FIELDS = (
+        ("description", None),
+        ("input_schema", _dump_schema),
+        ("tool_type", None),
+        ("uipath_process_name", None),
+        ("uipath_process_key", None),
+        ("uipath_folder_path", None),
+        ("uipath_folder_id", None),
+        ("builtin_tool_id", None),
+    )
+    # An empty api_key clears it
+    _BUILTIN_TOOL_UPDATE_FIELDS = (
+        ("description", None),
+        ("input_schema", _dump_schema),
+        ("python_function", None),
+        ("api_key", lambda value: value or None),
+        ("is_active", lambda value: 1 if value else 0),
+    )
+
+    def __init__(self, db_path: str = "database/mcp_servers.db", pool_size: int = POOL_SIZE):
         """Initialize database connection.
 
         Args:
             db_path: Path to SQLite database file
+            pool_size: Maximum number of pooled connections
         """
         self.db_path = db_path
+        self.pool_size = pool_size
+        self._pool: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
+        self._opened = 0
+        self._schema_cache: Dict[str, Dict[str, Any]] = {}
+        # Raw rows, so every hit builds its own dict and input_schema
+        self._name_cache: Dict[str, Tuple[float, tuple]] = {}
+
+    async def _acquire(self) -> aiosqlite.Connection:
+        """Take a connection from the pool, opening one if below pool_size."""
+        if self._pool.empty() and self._opened < self.pool_size:
+            self._opened += 1
+            try:
+                # Autocommit: single statements need no separate commit()
+                # round-trip; multi-statement writes open their own BEGIN
+                db = await aiosqlite.connect(
+                    self.db_path,
+                    isolation_level=None,
+                    cached_statements=STATEMENT_CACHE_SIZE,
+                )
+                await db.executescript(CONNECTION_PRAGMAS)
+            except BaseException:
+                self._opened -= 1
+                raise
+            return db
+        return await self._pool.get()
+
+    async def _release(self, db: aiosqlite.Connection) -> None:
+        """Return a connection to the pool in a clean state."""
+        try:
+            if db.in_transaction:
+                await db.rollback()
+        except Exception:
+            # Connection is unusable; drop it so a fresh one is opened
+            self._opened -= 1
+            await db.close()
+            return
+        db.row_factory = None
+        self._pool.put_nowait(db)
+
+    @asynccontextmanager
+    async def _connect(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a pooled connection with CONNECTION_PRAGMAS applied."""
+        db = await self._acquire()
+        try:
+            yield db
+        finally:
+            await self._release(db)
+
+    async def close(self) -> None:
+        """Close all idle pooled connections."""
+        while not self._pool.empty():
+            db = self._pool.get_nowait()
+            self._opened -= 1
+            await db.close()
 
     async def initialize(self):
         """Create database tables if they don't exist."""
         # Check if database file exists
         db_exists = os.path.exists(self.db_path)
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
+            # The whole schema bootstrap commits once at the end
+            await db.execute("BEGIN")
+
             # Users table
             await db.execute(
                 """
@@ -46,29 +313,6 @@ class Database:
             """
             )
 
-            # Add OAuth columns if they don't exist (migration)
-            try:
-                await db.execute("ALTER TABLE users ADD COLUMN uipath_client_id TEXT")
-                await db.commit()
-            except aiosqlite.OperationalError:
-                pass
-
-            try:
-                await db.execute(
-                    "ALTER TABLE users ADD COLUMN uipath_client_secret TEXT"
-                )
-                await db.commit()
-            except aiosqlite.OperationalError:
-                pass
-
-            try:
-                await db.execute(
-                    "ALTER TABLE users ADD COLUMN uipath_auth_type TEXT DEFAULT 'pat'"
-                )
-                await db.commit()
-            except aiosqlite.OperationalError:
-                pass
-
             # MCP Server endpoints table (with user ownership)
             await db.execute(
                 """
@@ -141,66 +385,15 @@ class Database:
             """
             )
 
-            # Add uipath_process_key column if it doesn't exist (migration)
-            try:
-                await db.execute(
-                    "ALTER TABLE mcp_tools ADD COLUMN uipath_process_key TEXT"
-                )
-                await db.commit()
-            except aiosqlite.OperationalError:
-                # Column already exists, ignore
-                pass
-
-            # Add tool_type column if it doesn't exist (migration)
-            try:
-                await db.execute(
-                    "ALTER TABLE mcp_tools ADD COLUMN tool_type TEXT DEFAULT 'uipath'"
-                )
-                await db.commit()
-            except aiosqlite.OperationalError:
-                pass
-
-            # Add builtin_tool_id column if it doesn't exist (migration)
-            try:
-                await db.execute(
-                    "ALTER TABLE mcp_tools ADD COLUMN builtin_tool_id INTEGER"
-                )
-                await db.commit()
-            except aiosqlite.OperationalError:
-                pass
-
-            # Add api_key column to builtin_tools if it doesn't exist (migration)
-            try:
-                await db.execute(
-                    "ALTER TABLE builtin_tools ADD COLUMN api_key TEXT"
-                )
-                await db.commit()
-            except aiosqlite.OperationalError:
-                pass
-
-            # Migrate existing data: set tool_type to 'uipath' for NULL values
-            try:
-                await db.execute(
-                    """
-                    UPDATE mcp_tools 
-                    SET tool_type = 'uipath' 
-                    WHERE tool_type IS NULL
-                    """
-                )
-                await db.commit()
-                # Log migration result
-                import logging
-                logger = logging.getLogger(__name__)
-                cursor = await db.execute(
-                    "SELECT COUNT(*) FROM mcp_tools WHERE tool_type = 'uipath'"
-                )
-                count = await cursor.fetchone()
-                if count and count[0] > 0:
-                    logger.info(f"Migrated {count[0]} existing tools to tool_type='uipath'")
-            except Exception as e:
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.warning(f"Migration warning: {e}")
+            # Databases created before these columns were part of the
+            # CREATE TABLE statements are upgraded once, tracked through
+            # SQLite's user_version
+            cursor = await db.execute("PRAGMA user_version")
+            (user_version,) = await cursor.fetchone()
+            if user_version < SCHEMA_VERSION:
+                if db_exists:
+                    await self._migrate_legacy_schema(db)
+                await db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
             # Create indexes for better query performance
             await db.execute(
@@ -217,17 +410,19 @@ class Database:
             """
             )
 
-            await db.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_mcp_servers_tenant_server 
-                ON mcp_servers(tenant_name, server_name)
-            """
-            )
+            # Lookups by (tenant_name, server_name) and (server_id, name),
+            # and per-server tool listings ordered by name, are served by
+            # the UNIQUE constraint indexes on those column pairs; these
+            # narrower duplicates only cost extra writes
+            await db.execute("DROP INDEX IF EXISTS idx_mcp_servers_tenant_server")
+            await db.execute("DROP INDEX IF EXISTS idx_mcp_tools_server")
 
+            # Lets ON DELETE SET NULL find referencing tools without a scan;
+            # partial since most tools are UiPath tools with no builtin
             await db.execute(
                 """
-                CREATE INDEX IF NOT EXISTS idx_mcp_tools_server 
-                ON mcp_tools(server_id)
+                CREATE INDEX IF NOT EXISTS idx_mcp_tools_builtin_tool_id 
+                ON mcp_tools(builtin_tool_id) WHERE builtin_tool_id IS NOT NULL
             """
             )
 
@@ -247,10 +442,28 @@ class Database:
         # Register built-in tools (uses version-based migration)
         await self._register_builtin_tools()
 
+    async def _migrate_legacy_schema(self, db: aiosqlite.Connection):
+        """Add columns missing from databases created by older versions."""
+        for statement in LEGACY_COLUMN_MIGRATIONS:
+            await db.execute("SAVEPOINT add_column")
+            try:
+                await db.execute(statement)
+            except aiosqlite.OperationalError:
+                # Column already exists
+                await db.execute("ROLLBACK TO add_column")
+            await db.execute("RELEASE add_column")
+
+        # Migrate existing data: set tool_type to 'uipath' for NULL values
+        cursor = await db.execute(
+            "UPDATE mcp_tools SET tool_type = 'uipath' WHERE tool_type IS NULL"
+        )
+        if cursor.rowcount > 0:
+            logger.info(f"Migrated {cursor.rowcount} existing tools to tool_type='uipath'")
+
     # ==================== User Management ====================
 
     def _hash_password(self, password: str) -> str:
-        """Hash a password using SHA-256.
+        """Hash a password using bcrypt.
 
         Args:
             password: Plain text password
@@ -258,7 +471,7 @@ class Database:
         Returns:
             Hashed password
         """
-        return hashlib.sha256(password.encode()).hexdigest()
+        return hash_password(password)
 
     async def _create_default_admin(self):
         """Create default admin user if database is new.
@@ -269,9 +482,6 @@ class Database:
         - Email: admin@mydomain.com
         - Role: admin
         """
-        import logging
-        logger = logging.getLogger(__name__)
-        
         try:
             # Check if admin user already exists
             existing_admin = await self.get_user_by_username("admin")
@@ -313,9 +523,10 @@ class Database:
         Returns:
             User ID
         """
-        hashed_password = self._hash_password(password)
+        # bcrypt is deliberately slow; keep it off the event loop
+        hashed_password = await asyncio.to_thread(self._hash_password, password)
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 """
                 INSERT INTO users (username, email, hashed_password, role, is_active)
@@ -323,7 +534,6 @@ class Database:
                 """,
                 (username, email, hashed_password, role, is_active),
             )
-            await db.commit()
             return cursor.lastrowid
 
     async def update_user_password(
@@ -345,14 +555,16 @@ class Database:
             return False
 
         # Verify old password
-        if not self.verify_password(old_password, user["hashed_password"]):
+        if not await asyncio.to_thread(
+            self.verify_password, old_password, user["hashed_password"]
+        ):
             return False
 
         # Hash new password
-        new_hashed_password = self._hash_password(new_password)
+        new_hashed_password = await asyncio.to_thread(self._hash_password, new_password)
 
         # Update password
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 """
                 UPDATE users 
@@ -361,7 +573,6 @@ class Database:
                 """,
                 (new_hashed_password, user_id),
             )
-            await db.commit()
             return cursor.rowcount > 0
 
     async def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
@@ -373,31 +584,15 @@ class Database:
         Returns:
             User data or None if not found
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._connect() as db:
             cursor = await db.execute(
-                "SELECT * FROM users WHERE username = ?", (username,)
+                f"{USER_SELECT} WHERE username = ?", (username,)
             )
             row = await cursor.fetchone()
             if row:
-                # Convert sqlite Row to a plain dict for safe .get access
-                row_dict = dict(row)
-                return {
-                    "id": row_dict.get("id"),
-                    "username": row_dict.get("username"),
-                    "email": row_dict.get("email"),
-                    "hashed_password": row_dict.get("hashed_password"),
-                    "role": row_dict.get("role"),
-                    "is_active": bool(row_dict.get("is_active")),
-                    "uipath_url": row_dict.get("uipath_url"),
-                    "uipath_auth_type": row_dict.get("uipath_auth_type", "pat"),
-                    "uipath_access_token": row_dict.get("uipath_access_token"),
-                    "uipath_client_id": row_dict.get("uipath_client_id"),
-                    "uipath_client_secret": row_dict.get("uipath_client_secret"),
-                    "uipath_folder_path": row_dict.get("uipath_folder_path"),
-                    "created_at": row_dict.get("created_at"),
-                    "updated_at": row_dict.get("updated_at"),
-                }
+                user = dict(zip(USER_COLUMNS, row))
+                user["is_active"] = bool(user["is_active"])
+                return user
             return None
 
     async def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
@@ -409,28 +604,13 @@ class Database:
         Returns:
             User data or None if not found
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+        async with self._connect() as db:
+            cursor = await db.execute(f"{USER_SELECT} WHERE id = ?", (user_id,))
             row = await cursor.fetchone()
             if row:
-                row_dict = dict(row)
-                return {
-                    "id": row_dict.get("id"),
-                    "username": row_dict.get("username"),
-                    "email": row_dict.get("email"),
-                    "hashed_password": row_dict.get("hashed_password"),
-                    "role": row_dict.get("role"),
-                    "is_active": bool(row_dict.get("is_active")),
-                    "uipath_url": row_dict.get("uipath_url"),
-                    "uipath_auth_type": row_dict.get("uipath_auth_type", "pat"),
-                    "uipath_access_token": row_dict.get("uipath_access_token"),
-                    "uipath_client_id": row_dict.get("uipath_client_id"),
-                    "uipath_client_secret": row_dict.get("uipath_client_secret"),
-                    "uipath_folder_path": row_dict.get("uipath_folder_path"),
-                    "created_at": row_dict.get("created_at"),
-                    "updated_at": row_dict.get("updated_at"),
-                }
+                user = dict(zip(USER_COLUMNS, row))
+                user["is_active"] = bool(user["is_active"])
+                return user
             return None
 
     async def update_user_uipath_config(
@@ -455,46 +635,33 @@ class Database:
         Returns:
             True if updated, False if not found
         """
-        updates = []
-        params = []
-
-        if uipath_url is not None:
-            updates.append("uipath_url = ?")
-            params.append(uipath_url if uipath_url else None)
-        if uipath_auth_type is not None:
-            updates.append("uipath_auth_type = ?")
-            params.append(uipath_auth_type)
-        if uipath_access_token is not None:
-            # Empty string means clear the token
-            updates.append("uipath_access_token = ?")
-            params.append(uipath_access_token if uipath_access_token else None)
-        if uipath_client_id is not None:
-            # Empty string means clear the client ID
-            updates.append("uipath_client_id = ?")
-            params.append(uipath_client_id if uipath_client_id else None)
-        if uipath_client_secret is not None:
-            # Empty string means clear the client secret
-            updates.append("uipath_client_secret = ?")
-            params.append(uipath_client_secret if uipath_client_secret else None)
-
-        if not updates:
+        fields = (
+            uipath_url,
+            uipath_auth_type,
+            uipath_access_token,
+            uipath_client_id,
+            uipath_client_secret,
+        )
+        if all(field is None for field in fields):
             return False
 
-        updates.append("updated_at = CURRENT_TIMESTAMP")
-        params.append(user_id)
-
-        # Log the SQL query for debugging
-        import logging
-
-        logger = logging.getLogger(__name__)
-        sql_query = f"UPDATE users SET {', '.join(updates)} WHERE id = ?"
-        logger.info(f"Executing SQL: {sql_query}")
-        logger.info(f"With params: {params}")
-
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute(sql_query, params)
-            await db.commit()
-            logger.info(f"Updated {cursor.rowcount} rows")
+        # One fixed statement for every combination of fields: NULL keeps
+        # the stored value, and an empty string clears it
+        async with self._connect() as db:
+            cursor = await db.execute(
+                """
+                UPDATE users SET
+                    uipath_url = CASE WHEN ?1 IS NULL THEN uipath_url ELSE NULLIF(?1, '') END,
+                    uipath_auth_type = COALESCE(?2, uipath_auth_type),
+                    uipath_access_token = CASE WHEN ?3 IS NULL THEN uipath_access_token ELSE NULLIF(?3, '') END,
+                    uipath_client_id = CASE WHEN ?4 IS NULL THEN uipath_client_id ELSE NULLIF(?4, '') END,
+                    uipath_client_secret = CASE WHEN ?5 IS NULL THEN uipath_client_secret ELSE NULLIF(?5, '') END,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?6
+                """,
+                (*fields, user_id),
+            )
+            logger.info("Updated %d rows", cursor.rowcount)
             return cursor.rowcount > 0
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
@@ -507,7 +674,7 @@ class Database:
         Returns:
             True if password matches
         """
-        return self._hash_password(plain_password) == hashed_password
+        return check_password(plain_password, hashed_password)
 
     # ==================== MCP Server Management ====================
 
@@ -529,7 +696,7 @@ class Database:
         Returns:
             Server ID
         """
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 """
                 INSERT INTO mcp_servers (tenant_name, server_name, user_id, description)
@@ -537,9 +704,48 @@ class Database:
                 """,
                 (tenant_name, server_name, user_id, description),
             )
-            await db.commit()
             return cursor.lastrowid
 
+    async def create_or_get_server(
+        self,
+        tenant_name: str,
+        server_name: str,
+        user_id: int,
+        description: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Create an MCP server endpoint unless one already exists.
+
+        A new server is inserted and returned in a single statement; an
+        existing server is left untouched.
+
+        Args:
+            tenant_name: Tenant name for the endpoint
+            server_name: Server name for the endpoint
+            user_id: ID of the user creating the server
+            description: Server description
+
+        Returns:
+            Tuple of (server data, True if it was created)
+        """
+        async with self._connect() as db:
+            rows = await db.execute_fetchall(
+                f"""
+                INSERT INTO mcp_servers (tenant_name, server_name, user_id, description)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(tenant_name, server_name) DO NOTHING
+                RETURNING {', '.join(SERVER_COLUMNS)}
+                """,
+                (tenant_name, server_name, user_id, description),
+            )
+            if rows:
+                return dict(zip(SERVER_COLUMNS, rows[0])), True
+
+            cursor = await db.execute(
+                f"{SERVER_SELECT} WHERE tenant_name = ? AND server_name = ?",
+                (tenant_name, server_name),
+            )
+            return dict(zip(SERVER_COLUMNS, await cursor.fetchone())), False
+
     async def get_server(
         self, tenant_name: str, server_name: str
     ) -> Optional[Dict[str, Any]]:
@@ -552,23 +758,14 @@ class Database:
         Returns:
             Server data or None if not found
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._connect() as db:
             cursor = await db.execute(
-                "SELECT * FROM mcp_servers WHERE tenant_name = ? AND server_name = ?",
+                f"{SERVER_SELECT} WHERE tenant_name = ? AND server_name = ?",
                 (tenant_name, server_name),
             )
             row = await cursor.fetchone()
             if row:
-                return {
-                    "id": row["id"],
-                    "tenant_name": row["tenant_name"],
-                    "server_name": row["server_name"],
-                    "description": row["description"],
-                    "user_id": row["user_id"],
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"],
-                }
+                return dict(zip(SERVER_COLUMNS, row))
             return None
 
     async def get_server_by_id(self, server_id: int) -> Optional[Dict[str, Any]]:
@@ -580,22 +777,13 @@ class Database:
         Returns:
             Server data or None if not found
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._connect() as db:
             cursor = await db.execute(
-                "SELECT * FROM mcp_servers WHERE id = ?", (server_id,)
+                f"{SERVER_SELECT} WHERE id = ?", (server_id,)
             )
             row = await cursor.fetchone()
             if row:
-                return {
-                    "id": row["id"],
-                    "tenant_name": row["tenant_name"],
-                    "server_name": row["server_name"],
-                    "description": row["description"],
-                    "user_id": row["user_id"],
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"],
-                }
+                return dict(zip(SERVER_COLUMNS, row))
             return None
 
     async def list_servers(self, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
@@ -607,32 +795,19 @@ class Database:
         Returns:
             List of server data
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-
+        async with self._connect() as db:
             if user_id is not None:
                 cursor = await db.execute(
-                    "SELECT * FROM mcp_servers WHERE user_id = ? ORDER BY tenant_name, server_name",
+                    f"{SERVER_SELECT} WHERE user_id = ? ORDER BY tenant_name, server_name",
                     (user_id,),
                 )
             else:
                 cursor = await db.execute(
-                    "SELECT * FROM mcp_servers ORDER BY tenant_name, server_name"
+                    f"{SERVER_SELECT} ORDER BY tenant_name, server_name"
                 )
 
             rows = await cursor.fetchall()
-            return [
-                {
-                    "id": row["id"],
-                    "tenant_name": row["tenant_name"],
-                    "server_name": row["server_name"],
-                    "description": row["description"],
-                    "user_id": row["user_id"],
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"],
-                }
-                for row in rows
-            ]
+            return [dict(zip(SERVER_COLUMNS, row)) for row in rows]
 
     async def update_server(
         self, tenant_name: str, server_name: str, description: Optional[str] = None
@@ -647,7 +822,7 @@ class Database:
         Returns:
             True if updated, False if not found
         """
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 """
                 UPDATE mcp_servers 
@@ -656,7 +831,6 @@ class Database:
                 """,
                 (description, tenant_name, server_name),
             )
-            await db.commit()
             return cursor.rowcount > 0
 
     async def delete_server(self, tenant_name: str, server_name: str) -> bool:
@@ -669,12 +843,11 @@ class Database:
         Returns:
             True if deleted, False if not found
         """
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 "DELETE FROM mcp_servers WHERE tenant_name = ? AND server_name = ?",
                 (tenant_name, server_name),
             )
-            await db.commit()
             return cursor.rowcount > 0
 
     async def generate_server_token(
@@ -694,7 +867,7 @@ class Database:
         # Generate a secure random token
         token = secrets.token_urlsafe(32)
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 """
                 UPDATE mcp_servers 
@@ -703,7 +876,6 @@ class Database:
                 """,
                 (token, tenant_name, server_name),
             )
-            await db.commit()
 
             if cursor.rowcount > 0:
                 return token
@@ -721,8 +893,7 @@ class Database:
         Returns:
             API token or None if not found
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._connect() as db:
             cursor = await db.execute(
                 "SELECT api_token FROM mcp_servers WHERE tenant_name = ? AND server_name = ?",
                 (tenant_name, server_name),
@@ -730,9 +901,30 @@ class Database:
             row = await cursor.fetchone()
 
             if row:
-                return row["api_token"]
+                return row[0]
             return None
 
+    async def verify_server_token(
+        self, tenant_name: str, server_name: str, token: str
+    ) -> bool:
+        """Check a presented API token against the server's token.
+
+        The comparison runs in constant time so response timing does not
+        reveal how much of the token matched.
+
+        Args:
+            tenant_name: Tenant name
+            server_name: Server name
+            token: Token presented by the client
+
+        Returns:
+            True if the server has an API token and it matches
+        """
+        server_token = await self.get_server_token(tenant_name, server_name)
+        if not server_token:
+            return False
+        return hmac.compare_digest(token.encode(), server_token.encode())
+
     async def revoke_server_token(self, tenant_name: str, server_name: str) -> bool:
         """Revoke (delete) the API token for an MCP server.
 
@@ -743,7 +935,7 @@ class Database:
         Returns:
             True if revoked, False if server not found
         """
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 """
                 UPDATE mcp_servers 
@@ -752,17 +944,35 @@ class Database:
                 """,
                 (tenant_name, server_name),
             )
-            await db.commit()
             return cursor.rowcount > 0
 
     # ==================== MCP Tool Management ====================
 
+    def _parse_schema(self, raw: str) -> Dict[str, Any]:
+        """Parse a stored input schema, reusing earlier results.
+
+        The returned dict is shared between callers and must not be mutated.
+        """
+        schema = self._schema_cache.get(raw)
+        if schema is None:
+            if len(self._schema_cache) >= SCHEMA_CACHE_SIZE:
+                self._schema_cache.clear()
+            schema = self._schema_cache[raw] = json_loads(raw)
+        return schema
+
+    def _tool_from_row(self, row: tuple) -> Dict[str, Any]:
+        """Build a tool dictionary from a row selected with TOOL_SELECT."""
+        tool = dict(zip(TOOL_COLUMNS, row))
+        tool["input_schema"] = self._parse_schema(tool["input_schema"])
+        tool["tool_type"] = tool["tool_type"] or "uipath"
+        return tool
+
     async def add_tool(
         self,
         server_id: int,
         name: str,
         description: str,
-        input_schema: Dict[str, Any],
+        input_schema: Union[str, Dict[str, Any]],
         tool_type: str = "uipath",
         uipath_process_name: Optional[str] = None,
         uipath_process_key: Optional[str] = None,
@@ -776,7 +986,8 @@ class Database:
             server_id: Server ID
             name: Tool name (must be unique within server)
             description: Tool description
-            input_schema: JSON Schema for tool input (MCP Tool spec)
+            input_schema: JSON Schema for tool input (MCP Tool spec), as a dict
+                or JSON text
             tool_type: Tool type ('uipath' or 'builtin')
             uipath_process_name: UiPath process name (optional)
             uipath_process_key: UiPath process key (optional)
@@ -787,7 +998,7 @@ class Database:
         Returns:
             Tool ID
         """
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 """
                 INSERT INTO mcp_tools 
@@ -800,7 +1011,7 @@ class Database:
                     server_id,
                     name,
                     description,
-                    json.dumps(input_schema),
+                    _dump_schema(input_schema),
                     tool_type,
                     uipath_process_name,
                     uipath_process_key,
@@ -809,9 +1020,63 @@ class Database:
                     builtin_tool_id,
                 ),
             )
-            await db.commit()
             return cursor.lastrowid
 
+    async def add_tools_bulk(
+        self, server_id: int, tools: List[Dict[str, Any]]
+    ) -> List[int]:
+        """Add many tools to an MCP server in one transaction.
+
+        Args:
+            server_id: Server ID
+            tools: Tool dictionaries with the same fields as add_tool();
+                name, description and input_schema are required
+
+        Returns:
+            Tool IDs, in the order the tools were given
+        """
+        rows = [
+            (
+                server_id,
+                tool["name"],
+                tool["description"],
+                _dump_schema(tool["input_schema"]),
+                tool.get("tool_type", "uipath"),
+                tool.get("uipath_process_name"),
+                tool.get("uipath_process_key"),
+                tool.get("uipath_folder_path"),
+                tool.get("uipath_folder_id"),
+                tool.get("builtin_tool_id"),
+            )
+            for tool in tools
+        ]
+        if not rows:
+            return []
+
+        ids: Dict[str, int] = {}
+        async with self._connect() as db:
+            await db.execute("BEGIN")
+            # Multi-row INSERT ... RETURNING yields each chunk's IDs in the
+            # same round-trip (executemany discards RETURNING rows)
+            for start in range(0, len(rows), BULK_INSERT_ROWS):
+                chunk = rows[start : start + BULK_INSERT_ROWS]
+                values = ", ".join(["(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"] * len(chunk))
+                returned = await db.execute_fetchall(
+                    f"""
+                    INSERT INTO mcp_tools 
+                    (server_id, name, description, input_schema, tool_type,
+                     uipath_process_name, uipath_process_key, uipath_folder_path, uipath_folder_id,
+                     builtin_tool_id)
+                    VALUES {values}
+                    RETURNING id, name
+                    """,
+                    [param for row in chunk for param in row],
+                )
+                ids.update((name, tool_id) for tool_id, name in returned)
+            await db.commit()
+        # RETURNING order is unspecified, so map IDs back by name
+        return [ids[tool["name"]] for tool in tools]
+
     async def get_tool(
         self, server_id: int, tool_name: str
     ) -> Optional[Dict[str, Any]]:
@@ -824,41 +1089,14 @@ class Database:
         Returns:
             Tool data or None if not found
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._connect() as db:
             cursor = await db.execute(
-                "SELECT * FROM mcp_tools WHERE server_id = ? AND name = ?",
+                f"{TOOL_SELECT} WHERE server_id = ? AND name = ?",
                 (server_id, tool_name),
             )
             row = await cursor.fetchone()
             if row:
-                try:
-                    process_key = row["uipath_process_key"]
-                except (KeyError, IndexError):
-                    process_key = None
-                try:
-                    tool_type = row["tool_type"]
-                except (KeyError, IndexError):
-                    tool_type = "uipath"
-                try:
-                    builtin_tool_id = row["builtin_tool_id"]
-                except (KeyError, IndexError):
-                    builtin_tool_id = None
-                return {
-                    "id": row["id"],
-                    "server_id": row["server_id"],
-                    "name": row["name"],
-                    "description": row["description"],
-                    "input_schema": json.loads(row["input_schema"]),
-                    "tool_type": tool_type,
-                    "uipath_process_name": row["uipath_process_name"],
-                    "uipath_process_key": process_key,
-                    "uipath_folder_path": row["uipath_folder_path"],
-                    "uipath_folder_id": row["uipath_folder_id"],
-                    "builtin_tool_id": builtin_tool_id,
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"],
-                }
+                return self._tool_from_row(row)
             return None
 
     async def list_tools(self, server_id: int) -> List[Dict[str, Any]]:
@@ -870,52 +1108,62 @@ class Database:
         Returns:
             List of tool data
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._connect() as db:
             cursor = await db.execute(
-                "SELECT * FROM mcp_tools WHERE server_id = ? ORDER BY name",
+                f"{TOOL_SELECT} WHERE server_id = ? ORDER BY name",
                 (server_id,),
             )
             rows = await cursor.fetchall()
-            result = []
-            for row in rows:
-                try:
-                    process_key = row["uipath_process_key"]
-                except (KeyError, IndexError):
-                    process_key = None
-                try:
-                    tool_type = row["tool_type"]
-                except (KeyError, IndexError):
-                    tool_type = "uipath"
-                try:
-                    builtin_tool_id = row["builtin_tool_id"]
-                except (KeyError, IndexError):
-                    builtin_tool_id = None
-                result.append(
-                    {
-                        "id": row["id"],
-                        "server_id": row["server_id"],
-                        "name": row["name"],
-                        "description": row["description"],
-                        "input_schema": json.loads(row["input_schema"]),
-                        "tool_type": tool_type,
-                        "uipath_process_name": row["uipath_process_name"],
-                        "uipath_process_key": process_key,
-                        "uipath_folder_path": row["uipath_folder_path"],
-                        "uipath_folder_id": row["uipath_folder_id"],
-                        "builtin_tool_id": builtin_tool_id,
-                        "created_at": row["created_at"],
-                        "updated_at": row["updated_at"],
-                    }
-                )
-            return result
+            return [self._tool_from_row(row) for row in rows]
+
+    async def iter_tools(self, server_id: int) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate over the tools of an MCP server without building a list.
+
+        Rows are fetched from SQLite in chunks as the caller consumes them;
+        the pooled connection is held until iteration finishes.
+
+        Args:
+            server_id: Server ID
+
+        Yields:
+            Tool data, ordered by name
+        """
+        async with self._connect() as db:
+            cursor = await db.execute(
+                f"{TOOL_SELECT} WHERE server_id = ? ORDER BY name",
+                (server_id,),
+            )
+            async for row in cursor:
+                yield self._tool_from_row(row)
+
+    @staticmethod
+    def _changed_columns(
+        fields: Tuple[Tuple[str, Any], ...], values: Dict[str, Any]
+    ) -> Tuple[List[str], List[Any]]:
+        """Pick the columns to update and their parameters.
+
+        Args:
+            fields: (column, transform) pairs in SET order
+            values: New values by column; None means unchanged
+
+        Returns:
+            Tuple of (column names, parameters)
+        """
+        columns = []
+        params = []
+        for column, transform in fields:
+            value = values[column]
+            if value is not None:
+                columns.append(column)
+                params.append(transform(value) if transform else value)
+        return columns, params
 
     async def update_tool(
         self,
         server_id: int,
         tool_name: str,
         description: Optional[str] = None,
-        input_schema: Optional[Dict[str, Any]] = None,
+        input_schema: Optional[Union[str, Dict[str, Any]]] = None,
         tool_type: Optional[str] = None,
         uipath_process_name: Optional[str] = None,
         uipath_process_key: Optional[str] = None,
@@ -929,7 +1177,7 @@ class Database:
             server_id: Server ID
             tool_name: Tool name
             description: New description (optional)
-            input_schema: New input schema (optional)
+            input_schema: New input schema, as a dict or JSON text (optional)
             tool_type: New tool type (optional)
             uipath_process_name: New UiPath process name (optional)
             uipath_process_key: New UiPath process key (optional)
@@ -940,46 +1188,28 @@ class Database:
         Returns:
             True if updated, False if not found
         """
-        updates = []
-        params = []
-
-        if description is not None:
-            updates.append("description = ?")
-            params.append(description)
-        if input_schema is not None:
-            updates.append("input_schema = ?")
-            params.append(json.dumps(input_schema))
-        if tool_type is not None:
-            updates.append("tool_type = ?")
-            params.append(tool_type)
-        if uipath_process_name is not None:
-            updates.append("uipath_process_name = ?")
-            params.append(uipath_process_name)
-        if uipath_process_key is not None:
-            updates.append("uipath_process_key = ?")
-            params.append(uipath_process_key)
-        if uipath_folder_path is not None:
-            updates.append("uipath_folder_path = ?")
-            params.append(uipath_folder_path)
-        if uipath_folder_id is not None:
-            updates.append("uipath_folder_id = ?")
-            params.append(uipath_folder_id)
-        if builtin_tool_id is not None:
-            updates.append("builtin_tool_id = ?")
-            params.append(builtin_tool_id)
-
-        if not updates:
+        values = {
+            "description": description,
+            "input_schema": input_schema,
+            "tool_type": tool_type,
+            "uipath_process_name": uipath_process_name,
+            "uipath_process_key": uipath_process_key,
+            "uipath_folder_path": uipath_folder_path,
+            "uipath_folder_id": uipath_folder_id,
+            "builtin_tool_id": builtin_tool_id,
+        }
+        columns, params = self._changed_columns(self._TOOL_UPDATE_FIELDS, values)
+
+        if not columns:
             return False
 
-        updates.append("updated_at = CURRENT_TIMESTAMP")
         params.extend([server_id, tool_name])
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
-                f"UPDATE mcp_tools SET {', '.join(updates)} WHERE server_id = ? AND name = ?",
+                _update_sql("mcp_tools", tuple(columns), "server_id = ? AND name = ?"),
                 params,
             )
-            await db.commit()
             return cursor.rowcount > 0
 
     async def delete_tool(self, server_id: int, tool_name: str) -> bool:
@@ -992,21 +1222,33 @@ class Database:
         Returns:
             True if deleted, False if not found
         """
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute(
                 "DELETE FROM mcp_tools WHERE server_id = ? AND name = ?",
                 (server_id, tool_name),
             )
-            await db.commit()
             return cursor.rowcount > 0
 
     # ==================== Built-in Tool Management ====================
 
+    @staticmethod
+    def _builtin_tool_from_row(
+        row: tuple, include_schema: bool = True
+    ) -> Dict[str, Any]:
+        """Build a built-in tool dictionary from a BUILTIN_TOOL_SELECT row."""
+        tool = dict(zip(BUILTIN_TOOL_COLUMNS, row))
+        tool["is_active"] = bool(tool["is_active"])
+        if include_schema:
+            tool["input_schema"] = json_loads(tool["input_schema"])
+        else:
+            del tool["input_schema"]
+        return tool
+
     async def create_builtin_tool(
         self,
         name: str,
         description: str,
-        input_schema: Dict[str, Any],
+        input_schema: Union[str, Dict[str, Any]],
         python_function: str,
         api_key: Optional[str] = None,
     ) -> int:
@@ -1015,55 +1257,87 @@ class Database:
         Args:
             name: Tool name (must be unique)
             description: Tool description
-            input_schema: JSON Schema for tool input
+            input_schema: JSON Schema for tool input, as a dict or JSON text
             python_function: Python function name or module path
             api_key: Optional API key for external service calls
 
         Returns:
             Built-in tool ID
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute(
+        async with self._connect() as db:
+            rows = await db.execute_fetchall(
                 """
                 INSERT INTO builtin_tools (name, description, input_schema, python_function, api_key)
                 VALUES (?, ?, ?, ?, ?)
+                RETURNING id
                 """,
-                (name, description, json.dumps(input_schema), python_function, api_key),
+                (name, description, _dump_schema(input_schema), python_function, api_key),
             )
+            return rows[0][0]
+
+    async def create_builtin_tools_many(
+        self, tools: List[Dict[str, Any]]
+    ) -> List[int]:
+        """Create many built-in tools in one transaction.
+
+        Args:
+            tools: Tool dictionaries with the same fields as
+                create_builtin_tool(); api_key is optional
+
+        Returns:
+            Built-in tool IDs, in the order the tools were given
+        """
+        rows = [
+            (
+                tool["name"],
+                tool["description"],
+                _dump_schema(tool["input_schema"]),
+                tool["python_function"],
+                tool.get("api_key"),
+            )
+            for tool in tools
+        ]
+        if not rows:
+            return []
+
+        ids: Dict[str, int] = {}
+        async with self._connect() as db:
+            await db.execute("BEGIN")
+            for start in range(0, len(rows), BULK_INSERT_ROWS):
+                chunk = rows[start : start + BULK_INSERT_ROWS]
+                values = ", ".join(["(?, ?, ?, ?, ?)"] * len(chunk))
+                returned = await db.execute_fetchall(
+                    f"""
+                    INSERT INTO builtin_tools (name, description, input_schema, python_function, api_key)
+                    VALUES {values}
+                    RETURNING id, name
+                    """,
+                    [param for row in chunk for param in row],
+                )
+                ids.update((name, tool_id) for tool_id, name in returned)
             await db.commit()
-            return cursor.lastrowid
+        return [ids[tool["name"]] for tool in tools]
 
-    async def get_builtin_tool(self, tool_id: int) -> Optional[Dict[str, Any]]:
+    async def get_builtin_tool(
+        self, tool_id: int, include_schema: bool = True
+    ) -> Optional[Dict[str, Any]]:
         """Get a built-in tool by ID.
 
         Args:
             tool_id: Built-in tool ID
+            include_schema: If False, skip parsing input_schema and leave it
+                out of the result
 
         Returns:
             Built-in tool data or None if not found
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._connect() as db:
             cursor = await db.execute(
-                "SELECT * FROM builtin_tools WHERE id = ?", (tool_id,)
+                f"{BUILTIN_TOOL_SELECT} WHERE id = ?", (tool_id,)
             )
             row = await cursor.fetchone()
             if row:
-                try:
-                    api_key = row["api_key"]
-                except (KeyError, IndexError):
-                    api_key = None
-                return {
-                    "id": row["id"],
-                    "name": row["name"],
-                    "description": row["description"],
-                    "input_schema": json.loads(row["input_schema"]),
-                    "python_function": row["python_function"],
-                    "api_key": api_key,
-                    "is_active": bool(row["is_active"]),
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"],
-                }
+                return self._builtin_tool_from_row(row, include_schema)
             return None
 
     async def get_builtin_tool_by_name(self, name: str) -> Optional[Dict[str, Any]]:
@@ -1075,76 +1349,53 @@ class Database:
         Returns:
             Built-in tool data or None if not found
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        cached = self._name_cache.get(name)
+        if cached and cached[0] > time.monotonic():
+            return self._builtin_tool_from_row(cached[1])
+
+        async with self._connect() as db:
             cursor = await db.execute(
-                "SELECT * FROM builtin_tools WHERE name = ?", (name,)
+                f"{BUILTIN_TOOL_SELECT} WHERE name = ?", (name,)
             )
             row = await cursor.fetchone()
             if row:
-                try:
-                    api_key = row["api_key"]
-                except (KeyError, IndexError):
-                    api_key = None
-                return {
-                    "id": row["id"],
-                    "name": row["name"],
-                    "description": row["description"],
-                    "input_schema": json.loads(row["input_schema"]),
-                    "python_function": row["python_function"],
-                    "api_key": api_key,
-                    "is_active": bool(row["is_active"]),
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"],
-                }
+                # Misses are not cached, so newly created tools show up at once
+                self._name_cache[name] = (
+                    time.monotonic() + BUILTIN_NAME_CACHE_TTL,
+                    row,
+                )
+                return self._builtin_tool_from_row(row)
             return None
 
     async def list_builtin_tools(
-        self, active_only: bool = True
+        self, active_only: bool = True, include_schema: bool = True
     ) -> List[Dict[str, Any]]:
         """List all built-in tools.
 
         Args:
             active_only: If True, only return active tools
+            include_schema: If False, skip parsing input_schema and leave it
+                out of each result
 
         Returns:
             List of built-in tool data
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._connect() as db:
             if active_only:
                 cursor = await db.execute(
-                    "SELECT * FROM builtin_tools WHERE is_active = 1 ORDER BY name"
+                    f"{BUILTIN_TOOL_SELECT} WHERE is_active = 1 ORDER BY name"
                 )
             else:
-                cursor = await db.execute(
-                    "SELECT * FROM builtin_tools ORDER BY name"
-                )
+                cursor = await db.execute(f"{BUILTIN_TOOL_SELECT} ORDER BY name")
             rows = await cursor.fetchall()
-            result = []
-            for row in rows:
-                try:
-                    api_key = row["api_key"]
-                except (KeyError, IndexError):
-                    api_key = None
-                result.append({
-                    "id": row["id"],
-                    "name": row["name"],
-                    "description": row["description"],
-                    "input_schema": json.loads(row["input_schema"]),
-                    "python_function": row["python_function"],
-                    "api_key": api_key,
-                    "is_active": bool(row["is_active"]),
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"],
-                })
-            return result
+        from_row = self._builtin_tool_from_row
+        return [from_row(row, include_schema) for row in rows]
 
     async def update_builtin_tool(
         self,
         tool_id: int,
         description: Optional[str] = None,
-        input_schema: Optional[Dict[str, Any]] = None,
+        input_schema: Optional[Union[str, Dict[str, Any]]] = None,
         python_function: Optional[str] = None,
         api_key: Optional[str] = None,
         is_active: Optional[bool] = None,
@@ -1154,7 +1405,7 @@ class Database:
         Args:
             tool_id: Built-in tool ID
             description: New description (optional)
-            input_schema: New input schema (optional)
+            input_schema: New input schema, as a dict or JSON text (optional)
             python_function: New python function (optional)
             api_key: New API key (optional)
             is_active: New active status (optional)
@@ -1162,38 +1413,28 @@ class Database:
         Returns:
             True if updated, False if not found
         """
-        updates = []
-        params = []
-
-        if description is not None:
-            updates.append("description = ?")
-            params.append(description)
-        if input_schema is not None:
-            updates.append("input_schema = ?")
-            params.append(json.dumps(input_schema))
-        if python_function is not None:
-            updates.append("python_function = ?")
-            params.append(python_function)
-        if api_key is not None:
-            updates.append("api_key = ?")
-            params.append(api_key if api_key else None)
-        if is_active is not None:
-            updates.append("is_active = ?")
-            params.append(1 if is_active else 0)
-
-        if not updates:
+        values = {
+            "description": description,
+            "input_schema": input_schema,
+            "python_function": python_function,
+            "api_key": api_key,
+            "is_active": is_active,
+        }
+        columns, params = self._changed_columns(self._BUILTIN_TOOL_UPDATE_FIELDS, values)
+
+        if not columns:
             return False
 
-        updates.append("updated_at = CURRENT_TIMESTAMP")
         params.append(tool_id)
 
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute(
-                f"UPDATE builtin_tools SET {', '.join(updates)} WHERE id = ?",
+        async with self._connect() as db:
+            rows = await db.execute_fetchall(
+                _update_sql("builtin_tools", tuple(columns), "id = ?") + " RETURNING 1",
                 params,
             )
-            await db.commit()
-            return cursor.rowcount > 0
+        # Updates address tools by ID, so drop every cached name
+        self._name_cache.clear()
+        return bool(rows)
 
     async def delete_builtin_tool(self, tool_id: int) -> bool:
         """Delete a built-in tool.
@@ -1204,223 +1445,56 @@ class Database:
         Returns:
             True if deleted, False if not found
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute(
-                "DELETE FROM builtin_tools WHERE id = ?", (tool_id,)
+        async with self._connect() as db:
+            rows = await db.execute_fetchall(
+                "DELETE FROM builtin_tools WHERE id = ? RETURNING 1", (tool_id,)
             )
-            await db.commit()
-            return cursor.rowcount > 0
+        self._name_cache.clear()
+        return bool(rows)
 
-    # ==================== Built-in Tool Management ====================
+    async def upsert_builtin_tools(self, tools: List[Dict[str, Any]]) -> int:
+        """Create or update many built-in tools in one transaction.
 
-    async def create_builtin_tool(
-        self,
-        name: str,
-        description: str,
-        input_schema: Dict[str, Any],
-        python_function: str,
-        api_key: Optional[str] = None,
-    ) -> int:
-        """Create a new built-in tool.
+        Tools are matched by name; existing rows keep their ID, API key and
+        active status.
 
         Args:
-            name: Tool name (must be unique)
-            description: Tool description
-            input_schema: JSON Schema for tool input
-            python_function: Python function name or module path
-            api_key: Optional API key for external service calls
-
-        Returns:
-            Built-in tool ID
-        """
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute(
-                """
-                INSERT INTO builtin_tools (name, description, input_schema, python_function, api_key)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (name, description, json.dumps(input_schema), python_function, api_key),
-            )
-            await db.commit()
-            return cursor.lastrowid
-
-    async def get_builtin_tool(self, tool_id: int) -> Optional[Dict[str, Any]]:
-        """Get a built-in tool by ID.
-
-        Args:
-            tool_id: Built-in tool ID
+            tools: Tool dictionaries with name, description, input_schema
+                and python_function
 
         Returns:
-            Built-in tool data or None if not found
-        """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute(
-                "SELECT * FROM builtin_tools WHERE id = ?", (tool_id,)
-            )
-            row = await cursor.fetchone()
-            if row:
-                try:
-                    api_key = row["api_key"]
-                except (KeyError, IndexError):
-                    api_key = None
-                return {
-                    "id": row["id"],
-                    "name": row["name"],
-                    "description": row["description"],
-                    "input_schema": json.loads(row["input_schema"]),
-                    "python_function": row["python_function"],
-                    "api_key": api_key,
-                    "is_active": bool(row["is_active"]),
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"],
-                }
-            return None
-
-    async def get_builtin_tool_by_name(self, name: str) -> Optional[Dict[str, Any]]:
-        """Get a built-in tool by name.
-
-        Args:
-            name: Tool name
-
-        Returns:
-            Built-in tool data or None if not found
+            Number of tools written
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute(
-                "SELECT * FROM builtin_tools WHERE name = ?", (name,)
+        rows = [
+            (
+                tool["name"],
+                tool["description"],
+                _dump_schema(tool["input_schema"]),
+                tool["python_function"],
             )
-            row = await cursor.fetchone()
-            if row:
-                try:
-                    api_key = row["api_key"]
-                except (KeyError, IndexError):
-                    api_key = None
-                return {
-                    "id": row["id"],
-                    "name": row["name"],
-                    "description": row["description"],
-                    "input_schema": json.loads(row["input_schema"]),
-                    "python_function": row["python_function"],
-                    "api_key": api_key,
-                    "is_active": bool(row["is_active"]),
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"],
-                }
-            return None
-
-    async def list_builtin_tools(
-        self, active_only: bool = True
-    ) -> List[Dict[str, Any]]:
-        """List all built-in tools.
-
-        Args:
-            active_only: If True, only return active tools
-
-        Returns:
-            List of built-in tool data
-        """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            if active_only:
-                cursor = await db.execute(
-                    "SELECT * FROM builtin_tools WHERE is_active = 1 ORDER BY name"
-                )
-            else:
-                cursor = await db.execute(
-                    "SELECT * FROM builtin_tools ORDER BY name"
-                )
-            rows = await cursor.fetchall()
-            result = []
-            for row in rows:
-                try:
-                    api_key = row["api_key"]
-                except (KeyError, IndexError):
-                    api_key = None
-                result.append({
-                    "id": row["id"],
-                    "name": row["name"],
-                    "description": row["description"],
-                    "input_schema": json.loads(row["input_schema"]),
-                    "python_function": row["python_function"],
-                    "api_key": api_key,
-                    "is_active": bool(row["is_active"]),
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"],
-                })
-            return result
-
-    async def update_builtin_tool(
-        self,
-        tool_id: int,
-        description: Optional[str] = None,
-        input_schema: Optional[Dict[str, Any]] = None,
-        python_function: Optional[str] = None,
-        api_key: Optional[str] = None,
-        is_active: Optional[bool] = None,
-    ) -> bool:
-        """Update a built-in tool.
-
-        Args:
-            tool_id: Built-in tool ID
-            description: New description (optional)
-            input_schema: New input schema (optional)
-            python_function: New python function (optional)
-            api_key: New API key (optional)
-            is_active: New active status (optional)
-
-        Returns:
-            True if updated, False if not found
-        """
-        updates = []
-        params = []
-
-        if description is not None:
-            updates.append("description = ?")
-            params.append(description)
-        if input_schema is not None:
-            updates.append("input_schema = ?")
-            params.append(json.dumps(input_schema))
-        if python_function is not None:
-            updates.append("python_function = ?")
-            params.append(python_function)
-        if api_key is not None:
-            updates.append("api_key = ?")
-            params.append(api_key if api_key else None)
-        if is_active is not None:
-            updates.append("is_active = ?")
-            params.append(1 if is_active else 0)
-
-        if not updates:
-            return False
-
-        updates.append("updated_at = CURRENT_TIMESTAMP")
-        params.append(tool_id)
-
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute(
-                f"UPDATE builtin_tools SET {', '.join(updates)} WHERE id = ?",
-                params,
-            )
-            await db.commit()
-            return cursor.rowcount > 0
-
-    async def delete_builtin_tool(self, tool_id: int) -> bool:
-        """Delete a built-in tool.
-
-        Args:
-            tool_id: Built-in tool ID
+            for tool in tools
+        ]
+        if not rows:
+            return 0
 
-        Returns:
-            True if deleted, False if not found
-        """
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute(
-                "DELETE FROM builtin_tools WHERE id = ?", (tool_id,)
+        async with self._connect() as db:
+            await db.execute("BEGIN")
+            await db.executemany(
+                """
+                INSERT INTO builtin_tools (name, description, input_schema, python_function)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    description = excluded.description,
+                    input_schema = excluded.input_schema,
+                    python_function = excluded.python_function,
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                rows,
             )
             await db.commit()
-            return cursor.rowcount > 0
+        for tool in tools:
+            self._name_cache.pop(tool["name"], None)
+        return len(rows)
 
     # ==================== System Metadata Management ====================
 
@@ -1430,8 +1504,7 @@ class Database:
         Returns:
             Current version number (0 if not set)
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._connect() as db:
             cursor = await db.execute(
                 "SELECT value FROM system_metadata WHERE key = ?",
                 ("builtin_tools_version",)
@@ -1439,7 +1512,7 @@ class Database:
             row = await cursor.fetchone()
             if row:
                 try:
-                    return int(row["value"])
+                    return int(row[0])
                 except (ValueError, TypeError):
                     return 0
             return 0
@@ -1450,7 +1523,7 @@ class Database:
         Args:
             version: Version number to set
         """
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute(
                 """
                 INSERT OR REPLACE INTO system_metadata (key, value, updated_at)
@@ -1458,7 +1531,6 @@ class Database:
                 """,
                 ("builtin_tools_version", str(version))
             )
-            await db.commit()
 
     async def get_metadata(self, key: str) -> Optional[str]:
         """Get a metadata value by key.
@@ -1469,15 +1541,14 @@ class Database:
         Returns:
             Metadata value or None if not found
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._connect() as db:
             cursor = await db.execute(
                 "SELECT value FROM system_metadata WHERE key = ?",
                 (key,)
             )
             row = await cursor.fetchone()
             if row:
-                return row["value"]
+                return row[0]
             return None
 
     async def set_metadata(self, key: str, value: str) -> None:
@@ -1487,7 +1558,7 @@ class Database:
             key: Metadata key
             value: Metadata value
         """
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute(
                 """
                 INSERT OR REPLACE INTO system_metadata (key, value, updated_at)
@@ -1495,4 +1566,3 @@ class Database:
                 """,
                 (key, value)
             )
-            await db.commit()
@@ -136,6 +136,14 @@ async def startup():
     logger.info("HTTP server startup complete")
 
 
+async def shutdown():
+    """Release pooled resources on shutdown."""
+    from .builtin._uipath_common import close_clients
+
+    await close_clients()
+    await db.close()
+
+
 async def get_or_create_mcp_server(
     tenant_name: str, server_name: str
 ) -> DynamicMCPServer:
@@ -227,7 +235,9 @@ async def login(request):
             )
 
         # Verify password
-        if not db.verify_password(login_data.password, user["hashed_password"]):
+        if not await asyncio.to_thread(
+            db.verify_password, login_data.password, user["hashed_password"]
+        ):
             logger.warning(f"Login failed: invalid password for {login_data.username}")
             return JSONResponse(
                 {"error": "Invalid username or password"}, status_code=401
@@ -1079,9 +1089,14 @@ async def create_server(request):
         data = await request.json()
         server = ServerCreate(**data)
 
-        # Check if exists
-        existing = await db.get_server(server.tenant_name, server.server_name)
-        if existing:
+        # Create server with current user as owner, unless it exists
+        created, is_new = await db.create_or_get_server(
+            tenant_name=server.tenant_name,
+            server_name=server.server_name,
+            user_id=user.id,
+            description=server.description,
+        )
+        if not is_new:
             return JSONResponse(
                 {
                     "error": f"Server '{server.tenant_name}/{server.server_name}' already exists"
@@ -1089,15 +1104,6 @@ async def create_server(request):
                 status_code=409,
             )
 
-        # Create server with current user as owner
-        server_id = await db.create_server(
-            tenant_name=server.tenant_name,
-            server_name=server.server_name,
-            user_id=user.id,
-            description=server.description,
-        )
-
-        created = await db.get_server(server.tenant_name, server.server_name)
         return JSONResponse(created, status_code=201)
 
     except Exception as e:
@@ -2074,6 +2080,7 @@ app = Starlette(
         Route("/api/admin/users/{user_id}", delete_user_admin, methods=["DELETE"]),
     ],
     on_startup=[startup],
+    on_shutdown=[shutdown],
 )
 
 # Check if static directory exists and mount static files
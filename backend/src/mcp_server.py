@@ -87,18 +87,14 @@ class DynamicMCPServer:
             # Capture session for notifications
             self._capture_session()
             
-            tools_data = await self.db.list_tools(self.server_id)
-            logger.info(f"Found {len(tools_data)} tools in database")
-
-            tools = []
-            for tool_data in tools_data:
-                tools.append(
-                    Tool(
-                        name=tool_data["name"],
-                        description=tool_data["description"],
-                        inputSchema=tool_data["input_schema"],
-                    )
+            tools = [
+                Tool(
+                    name=tool_data["name"],
+                    description=tool_data["description"],
+                    inputSchema=tool_data["input_schema"],
                 )
+                async for tool_data in self.db.iter_tools(self.server_id)
+            ]
 
             logger.info(f"Returning {len(tools)} tools")
             return tools
@@ -155,7 +151,9 @@ class DynamicMCPServer:
                             )
                         ]
                     
-                    builtin_tool = await self.db.get_builtin_tool(builtin_tool_id)
+                    builtin_tool = await self.db.get_builtin_tool(
+                        builtin_tool_id, include_schema=False
+                    )
                     if not builtin_tool:
                         return [
                             TextContent(
@@ -0,0 +1,87 @@
+"""Test built-in tool discovery and registration."""
+
+import asyncio
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import builtin_registry
+from src.builtin import uipath_folder, uipath_job
+from src.database import Database
+
+
+def test_discover_builtin_tools_skips_reexported_tools(monkeypatch):
+    """Test that tools re-exported by another module are discovered once."""
+    monkeypatch.setattr(uipath_job, "TOOLS", uipath_job.TOOLS + uipath_folder.TOOLS)
+    monkeypatch.setattr(builtin_registry, "_discovered_tools", None)
+
+    names = [tool["name"] for tool in builtin_registry.discover_builtin_tools()]
+
+    assert len(names) == len(set(names))
+    assert set(tool["name"] for tool in uipath_folder.TOOLS) <= set(names)
+
+
+def _register(tmp_path, monkeypatch, tools):
+    """Register the given tool definitions into a fresh database."""
+    db = Database(str(tmp_path / "test.db"))
+
+    async def run():
+        await db.initialize()
+        monkeypatch.setattr(builtin_registry, "discover_builtin_tools", lambda: tools)
+        monkeypatch.setattr(
+            builtin_registry, "BUILTIN_TOOLS_VERSION", builtin_registry.BUILTIN_TOOLS_VERSION + 1
+        )
+        try:
+            count = await builtin_registry.register_builtin_tools(db)
+            names = {row["name"] for row in await db.list_builtin_tools(active_only=False)}
+            return count, names
+        finally:
+            await db.close()
+
+    return asyncio.run(run())
+
+
+def _tool(name, **overrides):
+    """Build a minimal tool definition."""
+    return {
+        "name": name,
+        "description": f"{name} tool",
+        "input_schema": {"type": "object"},
+        "python_function": f"custom.{name}",
+        **overrides,
+    }
+
+
+def test_register_builtin_tools_skips_invalid_definitions(tmp_path, monkeypatch):
+    """Test that a bad tool definition is skipped instead of failing the batch."""
+    count, names = _register(tmp_path, monkeypatch, [
+        _tool("good"),
+        _tool("bad_schema", input_schema={"type": object()}),
+        _tool("bad_description", description=None),
+    ])
+
+    assert count == 1
+    assert "good" in names
+    assert not {"bad_schema", "bad_description"} & names
+
+
+def test_register_builtin_tools_falls_back_to_single_rows(tmp_path, monkeypatch):
+    """Test that a failed batch is retried tool by tool."""
+    upsert = Database.upsert_builtin_tools
+
+    async def failing_batch(self, rows):
+        if len(rows) > 1 or rows[0]["name"] == "rejected":
+            raise sqlite3.IntegrityError("constraint failed")
+        return await upsert(self, rows)
+
+    monkeypatch.setattr(Database, "upsert_builtin_tools", failing_batch)
+
+    count, names = _register(tmp_path, monkeypatch, [
+        _tool("first"), _tool("rejected"), _tool("second"),
+    ])
+
+    assert count == 2
+    assert {"first", "second"} <= names
+    assert "rejected" not in names
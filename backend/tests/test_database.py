@@ -0,0 +1,380 @@
+"""Test the SQLite database layer."""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.database import SCHEMA_VERSION, Database, check_password, hash_password
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Create an initialized database in a temporary directory."""
+    db = Database(str(tmp_path / "test.db"))
+    asyncio.run(db.initialize())
+    yield db
+    asyncio.run(db.close())
+
+
+def test_builtin_tools_registered_on_initialize(db):
+    """Test that initialize() registers the built-in tools once."""
+
+    tools = asyncio.run(db.list_builtin_tools())
+
+    assert tools
+    assert all(tool["python_function"] for tool in tools)
+    assert asyncio.run(db.get_builtin_tools_version()) > 0
+
+
+def test_upsert_builtin_tools_updates_in_place(db):
+    """Test that upserting keeps the row ID and refreshes the definition."""
+    tool = {
+        "name": "custom_tool",
+        "description": "First",
+        "input_schema": {"type": "object"},
+        "python_function": "custom.run",
+    }
+
+    assert asyncio.run(db.upsert_builtin_tools([tool])) == 1
+    first = asyncio.run(db.get_builtin_tool_by_name("custom_tool"))
+
+    asyncio.run(db.upsert_builtin_tools([{**tool, "description": "Second"}]))
+    second = asyncio.run(db.get_builtin_tool_by_name("custom_tool"))
+
+    assert second["id"] == first["id"]
+    assert second["description"] == "Second"
+    assert second["input_schema"] == {"type": "object"}
+    assert asyncio.run(db.upsert_builtin_tools([])) == 0
+
+
+def test_passwords_are_salted_and_legacy_hashes_still_verify():
+    """Test bcrypt hashing and the fallback for SHA-256 hashes of older accounts."""
+    hashed = hash_password("s3cret")
+
+    assert hashed.startswith("$2")
+    assert hashed != hash_password("s3cret")
+    assert check_password("s3cret", hashed)
+    assert not check_password("wrong", hashed)
+
+    legacy = hashlib.sha256(b"s3cret").hexdigest()
+    assert check_password("s3cret", legacy)
+    assert not check_password("wrong", legacy)
+
+
+def test_default_admin_can_log_in(db):
+    """Test that the default admin is stored with a verifiable bcrypt hash."""
+
+    admin = asyncio.run(db.get_user_by_username("admin"))
+
+    assert admin["hashed_password"].startswith("$2")
+    assert db.verify_password("admin", admin["hashed_password"])
+
+
+def test_connections_use_wal_and_enforce_foreign_keys(db):
+    """Test the connection pragmas, including cascading server deletes."""
+
+    async def run():
+        async with db._connect() as conn:
+            journal_mode = (await (await conn.execute("PRAGMA journal_mode")).fetchone())[0]
+            page_size = (await (await conn.execute("PRAGMA page_size")).fetchone())[0]
+        admin = await db.get_user_by_username("admin")
+        server_id = await db.create_server("tenant", "server", admin["id"])
+        await db.add_tool(server_id, "tool", "A tool", {"type": "object"})
+        await db.delete_server("tenant", "server")
+        return journal_mode, page_size, await db.list_tools(server_id)
+
+    journal_mode, page_size, tools = asyncio.run(run())
+
+    assert journal_mode == "wal"
+    assert page_size == 8192
+    assert tools == []
+
+
+def test_connections_are_pooled_and_reused(db):
+    """Test that sequential calls share one pooled connection."""
+
+    async def run():
+        async with db._connect() as first:
+            pass
+        async with db._connect() as second:
+            pass
+        opened = db._opened
+        await db.close()
+        return first is second, opened, db._opened
+
+    reused, opened, remaining = asyncio.run(run())
+
+    assert reused
+    assert opened == 1
+    assert remaining == 0
+
+
+def test_legacy_schema_is_migrated_once(tmp_path):
+    """Test that databases without the newer columns are upgraded and versioned."""
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE mcp_tools (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            server_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT,
+            input_schema TEXT NOT NULL,
+            uipath_process_name TEXT,
+            uipath_folder_path TEXT,
+            uipath_folder_id TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(server_id, name)
+        );
+        INSERT INTO mcp_tools (server_id, name, input_schema) VALUES (1, 'old', '{}');
+        """
+    )
+    conn.close()
+
+    db = Database(str(path))
+    asyncio.run(db.initialize())
+    asyncio.run(db.close())
+
+    conn = sqlite3.connect(path)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(mcp_tools)")}
+    tool_type = conn.execute("SELECT tool_type FROM mcp_tools").fetchone()[0]
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.close()
+
+    assert {"uipath_process_key", "tool_type", "builtin_tool_id"} <= columns
+    assert tool_type == "uipath"
+    assert version == SCHEMA_VERSION
+
+
+def test_add_tools_bulk_inserts_all_tools(db):
+    """Test that bulk tool registration writes every row in one call."""
+
+    async def run():
+        admin = await db.get_user_by_username("admin")
+        server_id = await db.create_server("tenant", "bulk", admin["id"])
+        ids = await db.add_tools_bulk(
+            server_id,
+            [
+                {"name": f"tool_{i:03}", "description": "Bulk", "input_schema": {"type": "object"}}
+                for i in range(100)
+            ],
+        )
+        streamed = [tool async for tool in db.iter_tools(server_id)]
+        return ids, await db.list_tools(server_id), streamed
+
+    ids, tools, streamed = asyncio.run(run())
+
+    assert ids == [tool["id"] for tool in tools]
+    assert len(tools) == 100
+    assert streamed == tools
+    assert all(tool["tool_type"] == "uipath" for tool in tools)
+
+
+def test_tool_schema_parse_is_cached(db):
+    """Test that unchanged schemas are parsed once and updates are picked up."""
+
+    async def run():
+        admin = await db.get_user_by_username("admin")
+        server_id = await db.create_server("tenant", "schemas", admin["id"])
+        await db.add_tool(server_id, "tool", "A tool", {"type": "object"})
+        first = await db.get_tool(server_id, "tool")
+        second = await db.get_tool(server_id, "tool")
+        await db.update_tool(server_id, "tool", input_schema={"type": "string"})
+        updated = await db.get_tool(server_id, "tool")
+        return first, second, updated
+
+    first, second, updated = asyncio.run(run())
+
+    assert first["input_schema"] is second["input_schema"]
+    assert updated["input_schema"] == {"type": "string"}
+
+
+def test_update_user_uipath_config_keeps_and_clears_fields(db):
+    """Test that None keeps a stored value and an empty string clears it."""
+
+    async def run():
+        admin = await db.get_user_by_username("admin")
+        await db.update_user_uipath_config(
+            admin["id"],
+            uipath_url="https://cloud.uipath.com/org/tenant",
+            uipath_auth_type="oauth",
+            uipath_client_id="client",
+            uipath_client_secret="secret",
+        )
+        await db.update_user_uipath_config(admin["id"], uipath_client_secret="")
+        nothing = await db.update_user_uipath_config(admin["id"])
+        return nothing, await db.get_user_by_id(admin["id"])
+
+    nothing, user = asyncio.run(run())
+
+    assert nothing is False
+    assert user["uipath_url"] == "https://cloud.uipath.com/org/tenant"
+    assert user["uipath_auth_type"] == "oauth"
+    assert user["uipath_client_id"] == "client"
+    assert user["uipath_client_secret"] is None
+
+
+def test_verify_server_token(db):
+    """Test API token verification, including after revocation."""
+
+    async def run():
+        admin = await db.get_user_by_username("admin")
+        await db.create_server("tenant", "tokens", admin["id"])
+        token = await db.generate_server_token("tenant", "tokens")
+        valid = await db.verify_server_token("tenant", "tokens", token)
+        wrong = await db.verify_server_token("tenant", "tokens", "x" * len(token))
+        await db.revoke_server_token("tenant", "tokens")
+        revoked = await db.verify_server_token("tenant", "tokens", token)
+        return valid, wrong, revoked
+
+    assert asyncio.run(run()) == (True, False, False)
+
+
+def test_create_or_get_server_leaves_existing_server(db):
+    """Test that a second create returns the existing server unchanged."""
+
+    async def run():
+        admin = await db.get_user_by_username("admin")
+        first = await db.create_or_get_server("tenant", "upsert", admin["id"], "First")
+        second = await db.create_or_get_server("tenant", "upsert", admin["id"], "Second")
+        return first, second
+
+    (created, is_new), (existing, second_is_new) = asyncio.run(run())
+
+    assert is_new and not second_is_new
+    assert existing == created
+    assert existing["description"] == "First"
+
+
+def test_builtin_tool_accepts_serialized_schema(db):
+    """Test that a schema passed as JSON text is stored without re-encoding."""
+
+    async def run():
+        tool_id = await db.create_builtin_tool(
+            "text_schema", "Schema as text", '{"type": "object"}', "custom.run"
+        )
+        created = await db.get_builtin_tool(tool_id)
+        await db.update_builtin_tool(tool_id, input_schema='{"type": "string"}')
+        return created, await db.get_builtin_tool(tool_id)
+
+    created, updated = asyncio.run(run())
+
+    assert created["input_schema"] == {"type": "object"}
+    assert updated["input_schema"] == {"type": "string"}
+
+
+def test_builtin_tool_schema_can_be_skipped(db):
+    """Test that callers that do not need the schema can skip parsing it."""
+
+    async def run():
+        tool_id = await db.create_builtin_tool(
+            "no_schema", "Schema skipped", {"type": "object"}, "custom.run"
+        )
+        tool = await db.get_builtin_tool(tool_id, include_schema=False)
+        listed = await db.list_builtin_tools(active_only=False, include_schema=False)
+        return tool, listed
+
+    tool, listed = asyncio.run(run())
+
+    assert tool["python_function"] == "custom.run"
+    assert "input_schema" not in tool
+    assert all("input_schema" not in row for row in listed)
+
+
+def test_update_tool_changes_only_given_fields(db):
+    """Test that partial tool updates leave the other columns alone."""
+
+    async def run():
+        admin = await db.get_user_by_username("admin")
+        server_id = await db.create_server("tenant", "updates", admin["id"])
+        await db.add_tool(
+            server_id, "tool", "Before", {"type": "object"}, uipath_process_key="key"
+        )
+        changed = await db.update_tool(server_id, "tool", description="After")
+        unchanged = await db.update_tool(server_id, "tool")
+        missing = await db.update_tool(server_id, "missing", description="After")
+        return changed, unchanged, missing, await db.get_tool(server_id, "tool")
+
+    changed, unchanged, missing, tool = asyncio.run(run())
+
+    assert (changed, unchanged, missing) == (True, False, False)
+    assert tool["description"] == "After"
+    assert tool["uipath_process_key"] == "key"
+
+
+def test_builtin_tool_writers_report_missing_rows(db):
+    """Test that built-in tool writers report whether a row was touched."""
+
+    async def run():
+        tool_id = await db.create_builtin_tool(
+            "writer", "Writer", {"type": "object"}, "custom.run"
+        )
+        return (
+            await db.update_builtin_tool(tool_id, is_active=False),
+            await db.update_builtin_tool(tool_id + 1000, is_active=False),
+            await db.delete_builtin_tool(tool_id),
+            await db.delete_builtin_tool(tool_id),
+            await db.get_builtin_tool(tool_id),
+        )
+
+    assert asyncio.run(run()) == (True, False, True, False, None)
+
+
+def test_create_builtin_tools_many(db):
+    """Test that built-in tools can be created in bulk, all or nothing."""
+    tools = [
+        {
+            "name": f"bulk_{i}",
+            "description": f"Bulk tool {i}",
+            "input_schema": {"type": "object"},
+            "python_function": "custom.run",
+        }
+        for i in range(100)
+    ]
+
+    async def run():
+        ids = await db.create_builtin_tools_many(tools)
+        with pytest.raises(sqlite3.IntegrityError):
+            await db.create_builtin_tools_many(
+                [dict(tools[0], name="bulk_new"), tools[1]]
+            )
+        return ids, await db.get_builtin_tool(ids[42]), await db.get_builtin_tool_by_name("bulk_new")
+
+    ids, tool, rolled_back = asyncio.run(run())
+
+    assert len(set(ids)) == 100
+    assert tool["name"] == "bulk_42"
+    assert tool["input_schema"] == {"type": "object"}
+    assert rolled_back is None
+
+
+def test_builtin_tool_name_lookup_is_cached_until_changed(db):
+    """Test that name lookups are cached and writers invalidate them."""
+
+    async def run():
+        tool_id = await db.create_builtin_tool(
+            "cached", "Before", {"type": "object"}, "custom.run"
+        )
+        first = await db.get_builtin_tool_by_name("cached")
+        first["description"] = "Mutated by caller"
+        first["input_schema"]["type"] = "string"
+        hit = await db.get_builtin_tool_by_name("cached")
+        await db.update_builtin_tool(tool_id, description="After")
+        updated = await db.get_builtin_tool_by_name("cached")
+        await db.delete_builtin_tool(tool_id)
+        return hit, updated, await db.get_builtin_tool_by_name("cached")
+
+    hit, updated, deleted = asyncio.run(run())
+
+    assert hit["description"] == "Before"
+    assert hit["input_schema"] == {"type": "object"}
+    assert updated["description"] == "After"
+    assert deleted is None
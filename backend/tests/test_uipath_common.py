@@ -0,0 +1,222 @@
+"""Test shared HTTP helpers for UiPath built-in tools."""
+
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.builtin._uipath_common import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceededError,
+    cache_get,
+    cache_invalidate,
+    cache_set,
+    deadline_after,
+    single_flight,
+    UiPathAPIError,
+    with_retry,
+)
+
+
+def _responder(*status_codes, headers=None):
+    """Build a send() callable returning the given status codes in order."""
+    calls = []
+
+    async def send():
+        status_code = status_codes[len(calls)]
+        calls.append(status_code)
+        response = httpx.Response(status_code, headers=headers)
+        response.request = httpx.Request("GET", "https://orchestrator.local/odata/Folders")
+        return response
+
+    return send, calls
+
+
+def test_retry_recovers_from_transient_status():
+    """Test that retryable statuses are retried until success."""
+    send, calls = _responder(503, 429, 200, headers={"retry-after": "0"})
+
+    response = asyncio.run(with_retry(send, base=0.0))
+
+    assert response.status_code == 200
+    assert calls == [503, 429, 200]
+
+
+def test_retry_does_not_retry_auth_errors():
+    """Test that 401 is raised immediately."""
+    send, calls = _responder(401, 200)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(with_retry(send, base=0.0))
+
+    assert calls == [401]
+
+
+def test_retry_gives_up_after_max_attempts():
+    """Test that transport errors are re-raised once attempts run out."""
+    attempts = []
+
+    async def send():
+        attempts.append(1)
+        raise httpx.ConnectError("connection refused")
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(with_retry(send, max_attempts=3, base=0.0))
+
+    assert len(attempts) == 3
+
+
+def test_retry_stops_at_deadline():
+    """Test that a deadline bounds slow attempts and skips pointless backoff."""
+    async def hang():
+        await asyncio.sleep(10)
+
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(with_retry(hang, deadline=deadline_after(0.05)))
+
+    # Retry-After longer than the remaining budget: fail with the real error
+    send, calls = _responder(503, 200, headers={"retry-after": "5"})
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(with_retry(send, deadline=deadline_after(1.0)))
+    assert calls == [503]
+
+
+def test_circuit_breaker_opens_and_recovers():
+    """Test that the breaker short-circuits after repeated 5xx and closes on a good probe."""
+    breaker = CircuitBreaker("https://orchestrator.local", failure_threshold=2, cooldown=60.0)
+    send, calls = _responder(500, 500, 200)
+
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(with_retry(send, max_attempts=1, breaker=breaker))
+
+    # Open: the request is not sent at all
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(with_retry(send, max_attempts=1, breaker=breaker))
+    assert calls == [500, 500]
+
+    # After the cooldown a probe goes through and closes the circuit
+    breaker.opened_at -= 60.0
+    response = asyncio.run(with_retry(send, max_attempts=1, breaker=breaker))
+    assert response.status_code == 200
+    assert breaker.state == "closed"
+
+
+def test_response_cache_ttl():
+    """Test that cached responses expire and ttl=0 bypasses the cache."""
+    key = ("https://orchestrator.local/odata/ProcessSchedules", "token", 1)
+    cache_set(key, [{"name": "Nightly"}])
+
+    assert cache_get(key, ttl=5.0) == [{"name": "Nightly"}]
+    assert cache_get(key, ttl=0) is None
+    assert cache_get(("other",), ttl=5.0) is None
+
+
+def test_cache_invalidate_by_predicate():
+    """Test that only matching cache entries are dropped."""
+    cache_set(("https://orchestrator.local/odata/Buckets", "token", 1), {"count": 1})
+    cache_set(("https://orchestrator.local/odata/Folders", "token", 1), [])
+
+    removed = cache_invalidate(lambda key: key[0].endswith("/odata/Buckets"))
+
+    assert removed == 1
+    assert cache_get(("https://orchestrator.local/odata/Buckets", "token", 1), ttl=5.0) is None
+    assert cache_get(("https://orchestrator.local/odata/Folders", "token", 1), ttl=5.0) == []
+
+
+def test_single_flight_shares_concurrent_requests():
+    """Test that concurrent identical calls share one fetch."""
+    fetches = []
+
+    async def fetch():
+        fetches.append(1)
+        await asyncio.sleep(0.01)
+        return {"total": 2}
+
+    async def run():
+        return await asyncio.gather(*(single_flight(("queues", 1), fetch) for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert len(fetches) == 1
+    assert results == [{"total": 2}] * 5
+
+
+def test_single_flight_propagates_errors():
+    """Test that a failed fetch raises in every waiter and is not remembered."""
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise httpx.ConnectError("connection refused")
+
+    async def run():
+        return await asyncio.gather(
+            *(single_flight(("queues", 2), fail) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(r, httpx.ConnectError) for r in results)
+    assert asyncio.run(single_flight(("queues", 2), lambda: asyncio.sleep(0, "ok"))) == "ok"
+
+
+def test_api_error_formats_response_lazily():
+    """Test that UiPathAPIError reports status and body of the failed response."""
+    response = httpx.Response(401, text="Unauthorized")
+
+    error = UiPathAPIError("HTTP error occurred", response)
+
+    assert error.status_code == 401
+    assert str(error) == "HTTP error occurred: 401 - Unauthorized"
+    assert str(UiPathAPIError("Request error occurred: boom")) == "Request error occurred: boom"
+
+
+def test_single_flight_survives_cancelled_leader():
+    """Test that cancelling the first caller does not fail the other waiters."""
+    fetches = []
+
+    async def fetch():
+        fetches.append(1)
+        await asyncio.sleep(0.05)
+        return {"total": 3}
+
+    async def run():
+        leader = asyncio.ensure_future(single_flight(("queues", 3), fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(single_flight(("queues", 3), fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        result = await follower
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return result
+
+    assert asyncio.run(run()) == {"total": 3}
+    assert len(fetches) == 1
+
+
+def test_retry_parses_body_inside_bulkhead_and_deadline():
+    """Test that parse runs while the bulkhead is held and counts toward the deadline."""
+    send, calls = _responder(200, 200)
+
+    async def run():
+        bulkhead = asyncio.Semaphore(1)
+
+        async def parse(response):
+            return bulkhead.locked()
+
+        held = await with_retry(send, bulkhead=bulkhead, parse=parse)
+
+        async def slow_parse(response):
+            await asyncio.sleep(10)
+
+        with pytest.raises(DeadlineExceededError):
+            await with_retry(send, parse=slow_parse, deadline=deadline_after(0.05))
+        return held
+
+    assert asyncio.run(run()) is True
+    assert calls == [200, 200]
@@ -0,0 +1,85 @@
+"""Test UiPath queue monitoring built-in tools."""
+
+import asyncio
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.builtin import _uipath_common, uipath_queue
+
+
+def _mock_client(monkeypatch, handler):
+    """Route the module's pooled client through a mock transport."""
+    requests = []
+
+    def record(request):
+        requests.append(request)
+        return handler(request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(record))
+    monkeypatch.setattr(uipath_queue, "get_client", lambda *args, **kwargs: client)
+    # Start from an empty response cache and leave the shared one untouched
+    monkeypatch.setattr(_uipath_common, "_response_cache", {})
+    return requests
+
+
+def test_cached_health_state_is_not_shared_with_callers(monkeypatch):
+    """Test that mutating a returned result leaves the cached response intact."""
+    requests = _mock_client(monkeypatch, lambda request: httpx.Response(200, json={
+        "data": [{"entityId": 2, "data": {"queueName": "BusinessQueue", "healthState": 3}}],
+    }))
+
+    async def run():
+        first = await uipath_queue.get_queues_health_state(
+            "https://orchestrator.local", "health-token", folder_id=1,
+        )
+        first["success"] = True
+        first["data"][0]["data"]["healthState"] = 0
+        return await uipath_queue.get_queues_health_state(
+            "https://orchestrator.local", "health-token", folder_id=1,
+        )
+
+    second = asyncio.run(run())
+
+    assert len(requests) == 1
+    assert "success" not in second
+    assert second["data"][0]["data"]["healthState"] == 3
+
+
+def test_cached_queues_table_is_not_shared_with_callers(monkeypatch):
+    """Test that mutating a returned table leaves the cached response intact."""
+    requests = _mock_client(monkeypatch, lambda request: httpx.Response(200, json={
+        "data": [{"queueId": 3, "queueName": "BusinessQueue", "countTotal": 16}],
+        "total": 1,
+    }))
+
+    async def run():
+        first = await uipath_queue.get_queues_table(
+            "https://orchestrator.local", "table-token", folder_id=1,
+        )
+        first["data"].clear()
+        return await uipath_queue.get_queues_table(
+            "https://orchestrator.local", "table-token", folder_id=1,
+        )
+
+    second = asyncio.run(run())
+
+    assert len(requests) == 1
+    assert second["data"][0]["countTotal"] == 16
+
+
+def test_get_all_queues_table_rejects_non_positive_page_size(monkeypatch):
+    """Test that an invalid page_size returns an error instead of dividing by zero."""
+    requests = _mock_client(monkeypatch, lambda request: httpx.Response(200, json={}))
+
+    for page_size in (0, -5):
+        result = asyncio.run(uipath_queue.get_all_queues_table(
+            "https://orchestrator.local", "token", folder_id=1, page_size=page_size,
+        ))
+        assert result["success"] is False
+        assert "page_size" in result["error"]
+
+    assert requests == []
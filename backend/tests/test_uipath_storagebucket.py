@@ -0,0 +1,106 @@
+"""Test UiPath storage bucket built-in tools."""
+
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.builtin import _uipath_common, uipath_storagebucket
+from src.builtin._uipath_common import UiPathAPIError
+from src.builtin.executor import execute_builtin_tool
+
+
+def test_get_storage_buckets_sends_folder_header(monkeypatch):
+    """Test that the folder ID is sent as the organization unit header."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={
+            "@odata.count": 1,
+            "value": [{"Id": 1, "Name": "poc", "Identifier": "10cb35c5"}],
+        })
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(uipath_storagebucket, "get_client", lambda *args, **kwargs: client)
+
+    result = asyncio.run(uipath_storagebucket.get_storage_buckets(
+        uipath_url="https://orchestrator.local",
+        access_token="token",
+        folder_id=7,
+        cache_ttl=0,
+    ))
+
+    assert requests[0].headers["x-uipath-organizationunitid"] == "7"
+    assert requests[0].headers["authorization"] == "Bearer token"
+    # Static Orchestrator headers come from the pooled client, not the call
+    assert "x-uipath-orchestrator" not in requests[0].headers
+    assert result["count"] == 1
+    assert result["buckets"][0]["name"] == "poc"
+
+
+def test_get_storage_buckets_raises_api_error(monkeypatch):
+    """Test that HTTP failures surface as UiPathAPIError with the cause kept."""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(403, text="Forbidden")
+    ))
+    monkeypatch.setattr(uipath_storagebucket, "get_client", lambda *args, **kwargs: client)
+
+    with pytest.raises(UiPathAPIError) as excinfo:
+        asyncio.run(uipath_storagebucket.get_storage_buckets(
+            uipath_url="https://orchestrator.local",
+            access_token="token",
+            folder_id=7,
+            cache_ttl=0,
+        ))
+
+    assert excinfo.value.status_code == 403
+    assert str(excinfo.value) == "HTTP error occurred: 403 - Forbidden"
+    assert isinstance(excinfo.value.__cause__, httpx.HTTPStatusError)
+
+
+def test_cached_bucket_is_not_shared_with_callers(monkeypatch):
+    """Test that results handed out by the executor leave the cache untouched."""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, json={
+            "@odata.count": 1,
+            "value": [{"Id": 1, "Name": "poc"}],
+        })
+    ))
+    monkeypatch.setattr(uipath_storagebucket, "get_client", lambda *args, **kwargs: client)
+    monkeypatch.setattr(_uipath_common, "_response_cache", {})
+
+    async def run():
+        bucket = await execute_builtin_tool(
+            "uipath_storagebucket.get_storage_bucket_by_name",
+            {"folder_id": 3, "bucket_name": "poc"},
+            uipath_url="https://orchestrator.local",
+            uipath_access_token="cache-token",
+        )
+        bucket["name"] = "changed"
+        return bucket, await uipath_storagebucket.get_storage_buckets(
+            uipath_url="https://orchestrator.local",
+            access_token="cache-token",
+            folder_id=3,
+            bucket_name="poc",
+        )
+
+    bucket, listed = asyncio.run(run())
+
+    assert bucket["success"] is True
+    assert listed["buckets"] == [
+        {
+            "id": 1,
+            "name": "poc",
+            "description": "",
+            "identifier": "",
+            "folders_count": 0,
+            "storage_provider": None,
+            "storage_container": None,
+            "options": "None",
+        }
+    ]